@@ -1,12 +1,134 @@
+import asyncio
+import random
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from enum import Enum
-from typing import Any, Optional, Type, TypeVar
-from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, Type, TypeVar
+import httpx
+import orjson
+from pydantic import BaseModel, ConfigDict, Field
+from config import get_settings
 from services.llm import llm_service
+from services.llm_cache import llm_cache
 
 T = TypeVar("T", bound=BaseModel)
 
+# Shared across all agents so parallel fan-out stays within provider limits
+llm_semaphore = asyncio.Semaphore(get_settings().llm_concurrency)
+
+# Serialized context values for the current task, keyed by id() of the value.
+# The value itself is kept in the entry so its id cannot be reused mid-task.
+_format_cache: ContextVar[Optional[dict[int, tuple[Any, str]]]] = ContextVar(
+    "format_cache", default=None
+)
+
+
+# Receives top-level field names of structured outputs as they stream in
+_field_listener: ContextVar[Optional[Callable[[str], None]]] = ContextVar(
+    "field_listener", default=None
+)
+
+# Set while requests must each reach the LLM (e.g. competing drafts)
+_independent_calls: ContextVar[bool] = ContextVar("independent_calls", default=False)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an LLM request error is worth retrying."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(
+        error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+    )
+
+
+# Monotonic deadline from the last Retry-After; every agent holds off until it passes
+# so concurrent callers don't hammer a provider that is already rate limiting us
+_rate_limited_until = 0.0
+
+# Upper bound on how long a Retry-After header may stall a request
+_MAX_RETRY_AFTER = 60.0
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked to wait before retrying, if it said so."""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    value = error.response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _hold_off(seconds: float) -> None:
+    """Pause all agents' LLM requests for at least ``seconds``."""
+    global _rate_limited_until
+    _rate_limited_until = max(_rate_limited_until, time.monotonic() + seconds)
+
+
+# Section headings for format_context, derived once per context key
+_SECTION_TITLES: dict[str, str] = {}
+
+
+def _json_default(value: Any) -> Any:
+    """Fallback for values orjson cannot serialize natively."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+@contextmanager
+def format_cache_scope() -> Iterator[None]:
+    """Memoize format_context serialization for the duration of one task.
+
+    Nested scopes share the outermost cache, so a caller can widen the scope
+    across several agent tasks that reuse the same context values.
+    """
+    if _format_cache.get() is not None:
+        yield
+        return
+    token = _format_cache.set({})
+    try:
+        yield
+    finally:
+        _format_cache.reset(token)
+
+
+@contextmanager
+def report_fields_to(listener: Callable[[str], None]) -> Iterator[None]:
+    """Stream structured completions in this scope, reporting each finished field."""
+    token = _field_listener.set(listener)
+    try:
+        yield
+    finally:
+        _field_listener.reset(token)
+
+
+@contextmanager
+def independent_calls() -> Iterator[None]:
+    """Send every LLM request in this scope, bypassing the cache and in-flight dedup."""
+    token = _independent_calls.set(True)
+    try:
+        yield
+    finally:
+        _independent_calls.reset(token)
+
 
 class TaskType(str, Enum):
     ANALYZE = "analyze"
@@ -18,6 +140,8 @@ class TaskType(str, Enum):
 class AgentTask(BaseModel):
     """A task for an agent to execute."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     task_type: TaskType
     description: str
     input_data: Any = None
@@ -28,11 +152,13 @@ class AgentTask(BaseModel):
 class AgentResponse(BaseModel):
     """Response from an agent."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     success: bool
     output: Any = None
     error_message: Optional[str] = None
     reasoning: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 class ReviewResult(BaseModel):
@@ -45,6 +171,23 @@ class ReviewResult(BaseModel):
     critical_issues: list[str] = Field(default_factory=list)
 
 
+class LazyPrompt:
+    """Class attribute that loads a system prompt from agents.prompts on first access."""
+
+    __slots__ = ("attr", "value")
+
+    def __init__(self, attr: str):
+        self.attr = attr
+        self.value: Optional[str] = None
+
+    def __get__(self, obj: Any, owner: type) -> str:
+        if self.value is None:
+            from . import prompts
+
+            self.value = getattr(prompts, self.attr)
+        return self.value
+
+
 class BaseAgent(ABC):
     """Base class for all agents."""
 
@@ -52,27 +195,78 @@ class BaseAgent(ABC):
     role: str
     system_prompt: str
 
-    def __init__(self):
+    # Identical requests currently awaiting the LLM, shared across agents
+    _inflight: dict[str, asyncio.Future] = {}
+
+    def __init__(self, semaphore: Optional[asyncio.Semaphore] = None):
         self.llm = llm_service
+        self.semaphore = semaphore or llm_semaphore
+
+    async def warmup(self):
+        """Prime the LLM connection pool so the next call skips the handshake."""
+        await self.llm.warmup()
 
     @abstractmethod
     async def execute(self, task: AgentTask) -> AgentResponse:
         """Execute a task and return response."""
         pass
 
+    def _cacheable(self, cache: bool, temperature: float) -> bool:
+        """Whether a response may be served from and stored in the LLM cache."""
+        if _independent_calls.get():
+            return False
+        return self.llm.settings.llm_cache_enabled and (cache or temperature <= 0.0)
+
     async def complete(
         self,
         user_message: str,
         temperature: float = 0.7,
         max_tokens: int = 4096,
+        cache: bool = False,
+        cached_prefix: Optional[str] = None,
+        model: Optional[str] = None,
     ) -> str:
-        """Simple text completion."""
-        return await self.llm.complete(
+        """Simple text completion.
+
+        Responses are cached when temperature is 0 or ``cache`` is set.
+        ``cached_prefix`` is static instruction text sent ahead of the user message
+        and marked for provider-side prompt caching. ``model`` overrides the
+        service default.
+        """
+        key = llm_cache.cache_key(
             system_prompt=self.system_prompt,
             user_message=user_message,
+            cached_prefix=cached_prefix,
             temperature=temperature,
             max_tokens=max_tokens,
+            model=model,
+            output_schema=None,
         )
+        cacheable = self._cacheable(cache, temperature)
+        if cacheable:
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                return cached
+
+        async def call() -> str:
+            result = await self._call_with_retry(
+                lambda: self.llm.complete(
+                    system_prompt=self.system_prompt,
+                    user_message=user_message,
+                    cached_prefix=cached_prefix,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    model=model,
+                )
+            )
+            if cacheable:
+                await llm_cache.set(key, result, ttl=self.llm.settings.llm_cache_ttl)
+            return result
+
+        if not cacheable:
+            # Sampled calls are independent; never merge them
+            return await call()
+        return await self._run_deduplicated(key, call)
 
     async def complete_structured(
         self,
@@ -80,25 +274,178 @@ class BaseAgent(ABC):
         output_schema: Type[T],
         temperature: float = 0.5,
         max_tokens: int = 4096,
+        cache: bool = False,
+        cached_prefix: Optional[str] = None,
+        model: Optional[str] = None,
+        prepare: Optional[Callable[[Any], Any]] = None,
     ) -> T:
-        """Structured completion with Pydantic model output."""
-        return await self.llm.complete_structured(
+        """Structured completion with Pydantic model output.
+
+        Responses are cached when temperature is 0 or ``cache`` is set; cache hits
+        are re-validated so callers always get a fresh instance. See ``complete``
+        for ``cached_prefix`` and ``model``; ``prepare`` normalizes the decoded
+        JSON before validation. Inside ``report_fields_to`` the response is
+        streamed and each completed top-level field is reported to the listener.
+        """
+        key = llm_cache.cache_key(
             system_prompt=self.system_prompt,
             user_message=user_message,
-            output_schema=output_schema,
+            cached_prefix=cached_prefix,
             temperature=temperature,
             max_tokens=max_tokens,
+            model=model,
+            output_schema=output_schema.__name__,
+        )
+        cacheable = self._cacheable(cache, temperature)
+        if cacheable:
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                return output_schema.model_validate_json(cached)
+
+        on_field = _field_listener.get()
+
+        async def call() -> T:
+            result = await self._call_with_retry(
+                lambda: self.llm.complete_structured(
+                    system_prompt=self.system_prompt,
+                    user_message=user_message,
+                    cached_prefix=cached_prefix,
+                    output_schema=output_schema,
+                    prepare=prepare,
+                    on_field=on_field,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    model=model,
+                )
+            )
+            if cacheable:
+                await llm_cache.set(
+                    key, result.model_dump_json(), ttl=self.llm.settings.llm_cache_ttl
+                )
+            return result
+
+        if not cacheable:
+            return await call()
+        return await self._run_deduplicated(
+            key, call, share=lambda result: result.model_copy(deep=True)
         )
 
+    async def stream(
+        self,
+        user_message: str,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Streaming text completion, yielding deltas as they arrive."""
+        async with self.semaphore:
+            async for delta in self.llm.stream(
+                system_prompt=self.system_prompt,
+                user_message=user_message,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                model=model,
+            ):
+                yield delta
+
+    async def _call_with_retry(
+        self,
+        request: Callable[[], Awaitable[Any]],
+        max_retries: Optional[int] = None,
+    ) -> Any:
+        """Run an LLM request under the semaphore, retrying transient failures.
+
+        Waits use full-jitter exponential backoff and happen outside the
+        semaphore so a sleeping retry does not hold a concurrency slot. A
+        Retry-After header sets a floor on the wait and pauses all agents.
+        """
+        if max_retries is None:
+            max_retries = get_settings().max_retries_per_stage
+
+        attempt = 0
+        while True:
+            pause = _rate_limited_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            try:
+                async with self.semaphore:
+                    return await request()
+            except Exception as e:
+                if attempt >= max_retries or not _is_transient(e):
+                    raise
+                wait = random.uniform(0, min(32, 2**attempt))
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    wait = max(wait, min(retry_after, _MAX_RETRY_AFTER))
+                    _hold_off(wait)
+            await asyncio.sleep(wait)
+            attempt += 1
+
+    async def _run_deduplicated(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[Any]],
+        share: Callable[[Any], Any] = lambda result: result,
+    ) -> Any:
+        """Run ``call`` once for concurrent requests sharing the same key.
+
+        The call runs as its own task; the first caller receives its result and
+        later callers ``share(result)``. Cancelling any one caller only stops that
+        caller's wait, never the shared call the others are awaiting.
+        """
+        task = BaseAgent._inflight.get(key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(call())
+            BaseAgent._inflight[key] = task
+            task.add_done_callback(lambda done: BaseAgent._finish_inflight(key, done))
+
+        result = await asyncio.shield(task)
+        return result if leader else share(result)
+
+    @staticmethod
+    def _finish_inflight(key: str, task: asyncio.Future):
+        """Drop a finished shared call from the in-flight table."""
+        if BaseAgent._inflight.get(key) is task:
+            del BaseAgent._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller was cancelled
+
     def format_context(self, context: dict) -> str:
         """Format context dict into readable string for prompt."""
-        parts = []
-        for key, value in context.items():
-            if isinstance(value, BaseModel):
-                value = value.model_dump_json(indent=2, exclude_none=True)
-            elif isinstance(value, dict):
-                import json
-
-                value = json.dumps(value, indent=2, ensure_ascii=False)
-            parts.append(f"## {key.replace('_', ' ').title()}\n{value}")
-        return "\n\n".join(parts)
+        if len(context) == 1:
+            # Common case: a single section, no join needed
+            ((key, value),) = context.items()
+            return self._format_section(key, value)
+        return "\n\n".join(self._format_section(key, value) for key, value in context.items())
+
+    def _format_section(self, key: str, value: Any) -> str:
+        """Format a single context entry as a titled prompt section."""
+        if isinstance(value, (BaseModel, dict, list)):
+            value = self._serialize_value(value)
+        title = _SECTION_TITLES.get(key)
+        if title is None:
+            title = _SECTION_TITLES[key] = key.replace("_", " ").title()
+        return f"## {title}\n{value}"
+
+    def _serialize_value(self, value: BaseModel | dict | list) -> str:
+        """Serialize a context value, reusing the result within a task scope."""
+        cache = _format_cache.get()
+        if cache is not None:
+            entry = cache.get(id(value))
+            if entry is not None and entry[0] is value:
+                return entry[1]
+
+        # orjson's indented output is much faster than model_dump_json(indent=2).
+        # Keys are sorted so equal context always renders to the same bytes,
+        # keeping provider prompt-cache prefixes stable across calls.
+        data = value.model_dump(exclude_none=True) if isinstance(value, BaseModel) else value
+        text = orjson.dumps(
+            data,
+            default=_json_default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS,
+        ).decode("utf-8")
+
+        if cache is not None:
+            cache[id(value)] = (value, text)
+        return text
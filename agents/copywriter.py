@@ -1,52 +1,21 @@
+import asyncio
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
 from pydantic import BaseModel, Field
-from .base import BaseAgent, AgentTask, AgentResponse, TaskType
-from models.creative import Creative, CreativeSet, YandexCreative, VKCreative, TelegramCreative
+from .base import BaseAgent, AgentTask, AgentResponse, TaskType, format_cache_scope, LazyPrompt
+from models.creative import (
+    Creative,
+    CreativeSet,
+    YandexCreative,
+    VKCreative,
+    TelegramCreative,
+    TelegramSeedingCreative,
+)
 from models.strategy import AdPlatform
 
-
-class CopywriterAgent(BaseAgent):
-    """Copywriter agent - creates ad copy for all platforms."""
-
-    name = "copywriter"
-    role = "Advertising Copywriter"
-
-    @property
-    def system_prompt(self) -> str:
-        from .prompts import COPYWRITER_SYSTEM_PROMPT
-        return COPYWRITER_SYSTEM_PROMPT
-
-    async def execute(self, task: AgentTask) -> AgentResponse:
-        """Execute copywriter task."""
-        try:
-            if task.task_type == TaskType.CREATE:
-                result = await self.create_copy(task)
-                return AgentResponse(success=True, output=result)
-            elif task.task_type == TaskType.REVISE:
-                result = await self.revise_copy(task)
-                return AgentResponse(success=True, output=result)
-            else:
-                return AgentResponse(
-                    success=False, error_message=f"Unknown task type: {task.task_type}"
-                )
-        except Exception as e:
-            return AgentResponse(success=False, error_message=str(e))
-
-    async def create_copy(self, task: AgentTask) -> CreativeSet:
-        """Create ad copy for all hypotheses."""
-        hypotheses = task.context.get("hypotheses", {})
-        brief = task.context.get("brief", {})
-        strategy = task.context.get("strategy", {})
-
-        prompt = f"""Напиши рекламные тексты для всех гипотез.
-
-БРИФ:
-{self.format_context({'brief': brief})}
-
-СТРАТЕГИЯ:
-{self.format_context({'strategy': strategy})}
-
-ГИПОТЕЗЫ:
-{self.format_context({'hypotheses': hypotheses})}
+# Static parts of the copywriting prompt. Kept ahead of the per-project data so
+# providers can serve them from their prompt cache across calls.
+_COPY_HEADER = """Напиши рекламные тексты для всех гипотез.
 
 Для каждой гипотезы создай креативы согласно указанному количеству (creatives_needed).
 Каждый креатив должен быть уникальным вариантом для A/B тестирования.
@@ -56,45 +25,72 @@ class CopywriterAgent(BaseAgent):
 Для каждого креатива укажи:
 - id: уникальный ID (c1, c2, c3...)
 - hypothesis_id: ID гипотезы (h1, h2...)
-- platform: yandex_direct, vk_ads или telegram_ads
+- platform: {platforms}
 - variant: буква варианта (A, B, C...)
 
 В зависимости от платформы заполни соответствующее поле:
+"""
 
+_COPY_PLATFORM_RULES = {
+    AdPlatform.YANDEX_DIRECT.value: """
 Для yandex_direct заполни поле yandex:
 - headline: заголовок (до 56 символов!)
 - text: текст (до 81 символа!)
 - quick_links: быстрые ссылки (до 4 шт, по 30 символов)
-
+""",
+    AdPlatform.VK_ADS.value: """
 Для vk_ads заполни поле vk:
 - headline: заголовок (до 40 символов!)
 - text: короткий текст (до 220 символов)
 - text_full: полный текст если нужен (до 2000)
 - button_text: текст кнопки (до 25 символов)
-
+""",
+    AdPlatform.TELEGRAM_ADS.value: """
 Для telegram_ads заполни поле telegram:
 - text: текст объявления (до 160 символов! считай точно!)
 - button_text: текст кнопки (до 25 символов)
+""",
+}
 
+_COPY_FOOTER = """
 ВАЖНО:
 - Строго соблюдай лимиты символов
 - Считай символы перед записью
 - Создавай разнообразные варианты
 - Учитывай тон коммуникации из стратегии
 
-Также укажи total_by_platform - количество креативов по платформам."""
+Также укажи total_by_platform - количество креативов по платформам.
 
-        return await self.complete_structured(prompt, CreativeSet)
+Данные для работы приведены ниже."""
 
-    async def revise_copy(self, task: AgentTask) -> CreativeSet:
-        """Revise copy based on feedback."""
-        original = task.input_data
-        feedback = task.context.get("feedback", "")
+# Full instructions, used when hypotheses are not split by platform
+CREATE_COPY_INSTRUCTIONS = (
+    _COPY_HEADER.format(platforms="yandex_direct, vk_ads или telegram_ads")
+    + "".join(_COPY_PLATFORM_RULES.values())
+    + _COPY_FOOTER
+)
 
-        prompt = f"""Доработай рекламные тексты на основе обратной связи.
+# Instructions carrying only the limits block of a single platform
+CREATE_COPY_INSTRUCTIONS_BY_PLATFORM = {
+    platform: _COPY_HEADER.format(platforms=platform) + rules + _COPY_FOOTER
+    for platform, rules in _COPY_PLATFORM_RULES.items()
+}
+
+
+CREATE_COPY_TEMPLATE = """БРИФ:
+{brief}
+
+СТРАТЕГИЯ:
+{strategy}
+
+ГИПОТЕЗЫ:
+{hypotheses}"""
+
+
+REVISE_COPY_TEMPLATE = """Доработай рекламные тексты на основе обратной связи.
 
 ИСХОДНЫЕ ТЕКСТЫ:
-{self.format_context({'original': original})}
+{original}
 
 ОБРАТНАЯ СВЯЗЬ:
 {feedback}
@@ -105,4 +101,187 @@ class CopywriterAgent(BaseAgent):
 3. Проверь соблюдение лимитов символов
 4. Улучши качество текстов"""
 
-        return await self.complete_structured(prompt, CreativeSet)
+
+# Per-item limit for Yandex quick links (the model only limits their count)
+QUICK_LINK_MAX_LENGTH = 30
+
+# Overruns fit_to_limits trims locally: up to this many characters or this share of the limit
+TRIM_TOLERANCE_CHARS = 5
+TRIM_TOLERANCE_RATIO = 0.1
+
+_PLATFORM_FIELDS = {
+    "yandex": YandexCreative,
+    "vk": VKCreative,
+    "telegram": TelegramCreative,
+    "telegram_seeding": TelegramSeedingCreative,
+}
+
+
+def _union_metadata(annotation: Any) -> list:
+    """Annotated metadata of Optional/Union members, which pydantic leaves nested."""
+    metadata = []
+    if get_origin(annotation) in (Union, UnionType):
+        for arg in get_args(annotation):
+            metadata.extend(getattr(arg, "__metadata__", ()))
+            metadata.extend(_union_metadata(arg))
+    return metadata
+
+
+def _max_lengths(model: type[BaseModel]) -> dict[str, int]:
+    """Collect max_length constraints declared on a model's fields."""
+    limits = {}
+    for name, field in model.model_fields.items():
+        for constraint in (*field.metadata, *_union_metadata(field.annotation)):
+            max_length = getattr(constraint, "max_length", None)
+            if max_length is not None:
+                limits[name] = max_length
+    return limits
+
+
+_FIELD_LIMITS = {key: _max_lengths(model) for key, model in _PLATFORM_FIELDS.items()}
+
+
+def _fit(text: str, limit: int) -> str:
+    """Trim a small overrun; larger ones are left for validation and repair."""
+    overrun = len(text) - limit
+    if overrun <= 0 or overrun > max(TRIM_TOLERANCE_CHARS, limit * TRIM_TOLERANCE_RATIO):
+        return text
+    return _truncate(text, limit)
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Cut text to limit, preferring a word boundary."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    space = cut.rfind(" ")
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut.rstrip(" ,;:-")
+
+
+def fit_to_limits(data: Any) -> Any:
+    """Trim slightly over-long platform fields in raw LLM output before validation.
+
+    LLMs regularly overshoot character limits by a few characters, which would
+    otherwise fail validation of the whole set and cost a full retry. Text that
+    runs well past its limit is left intact so validation reports it and the
+    repair round rewrites it instead of cutting it mid-thought.
+    """
+    if not isinstance(data, dict):
+        return data
+
+    for creative in data.get("creatives") or []:
+        if not isinstance(creative, dict):
+            continue
+        for key, limits in _FIELD_LIMITS.items():
+            fields = creative.get(key)
+            if not isinstance(fields, dict):
+                continue
+            for name, limit in limits.items():
+                value = fields.get(name)
+                if isinstance(value, str):
+                    fields[name] = _fit(value, limit)
+                elif isinstance(value, list):
+                    fields[name] = value[:limit]
+
+        yandex = creative.get("yandex")
+        if isinstance(yandex, dict) and isinstance(yandex.get("quick_links"), list):
+            yandex["quick_links"] = [
+                _fit(link, QUICK_LINK_MAX_LENGTH) if isinstance(link, str) else link
+                for link in yandex["quick_links"]
+            ]
+
+    return data
+
+
+class CopywriterAgent(BaseAgent):
+    """Copywriter agent - creates ad copy for all platforms."""
+
+    name = "copywriter"
+    role = "Advertising Copywriter"
+
+    system_prompt = LazyPrompt("COPYWRITER_SYSTEM_PROMPT")
+
+    async def execute(self, task: AgentTask) -> AgentResponse:
+        """Execute copywriter task."""
+        with format_cache_scope():
+            try:
+                if task.task_type == TaskType.CREATE:
+                    result = await self.create_copy(task)
+                    return AgentResponse.model_construct(success=True, output=result)
+                elif task.task_type == TaskType.REVISE:
+                    result = await self.revise_copy(task)
+                    return AgentResponse.model_construct(success=True, output=result)
+                else:
+                    return AgentResponse(
+                        success=False, error_message=f"Unknown task type: {task.task_type}"
+                    )
+            except Exception as e:
+                return AgentResponse(success=False, error_message=str(e))
+
+    async def create_copy(self, task: AgentTask) -> CreativeSet:
+        """Create ad copy for all hypotheses, one concurrent request per platform."""
+        hypotheses = task.context.get("hypotheses", {})
+        brief = task.context.get("brief", {})
+        strategy = task.context.get("strategy", {})
+
+        items = hypotheses.get("hypotheses", []) if isinstance(hypotheses, dict) else []
+        if not items:
+            return await self._create_copy_for(brief, strategy, hypotheses)
+
+        by_platform: dict[str, list[dict]] = {}
+        for h in items:
+            by_platform.setdefault(h.get("platform"), []).append(h)
+
+        parts = await asyncio.gather(
+            *(
+                self._create_copy_for(
+                    brief,
+                    strategy,
+                    {"hypotheses": group},
+                    CREATE_COPY_INSTRUCTIONS_BY_PLATFORM.get(platform, CREATE_COPY_INSTRUCTIONS),
+                )
+                for platform, group in by_platform.items()
+            )
+        )
+        return self._merge_creative_sets(parts)
+
+    def _merge_creative_sets(self, parts: list[CreativeSet]) -> CreativeSet:
+        """Merge per-platform results, renumbering IDs so they stay unique."""
+        creatives = [c for part in parts for c in part.creatives]
+        for i, creative in enumerate(creatives, start=1):
+            creative.id = f"c{i}"
+        merged = CreativeSet.model_construct(creatives=creatives)
+        merged.total_by_platform = merged.count_by_platform()
+        return merged
+
+    async def _create_copy_for(
+        self,
+        brief: dict,
+        strategy: dict,
+        hypotheses: dict,
+        instructions: str = CREATE_COPY_INSTRUCTIONS,
+    ) -> CreativeSet:
+        """Create ad copy for the given hypotheses in a single structured call."""
+        prompt = CREATE_COPY_TEMPLATE.format(
+            brief=self.format_context({'brief': brief}),
+            strategy=self.format_context({'strategy': strategy}),
+            hypotheses=self.format_context({'hypotheses': hypotheses}),
+        )
+
+        return await self.complete_structured(
+            prompt, CreativeSet, cached_prefix=instructions, prepare=fit_to_limits
+        )
+
+    async def revise_copy(self, task: AgentTask) -> CreativeSet:
+        """Revise copy based on feedback."""
+        original = task.input_data
+        feedback = task.context.get("feedback", "")
+
+        prompt = REVISE_COPY_TEMPLATE.format(
+            original=self.format_context({'original': original}),
+            feedback=feedback,
+        )
+
+        return await self.complete_structured(prompt, CreativeSet, prepare=fit_to_limits)
@@ -1,9 +1,65 @@
+import asyncio
+from datetime import datetime, timezone
 from pydantic import BaseModel, Field
-from .base import BaseAgent, AgentTask, AgentResponse, TaskType
-from models.creative import Banner, BannerSpec, CreativeSet
+from .base import BaseAgent, AgentTask, AgentResponse, TaskType, format_cache_scope, LazyPrompt
+from models.creative import Banner, BannerSpec, Creative, CreativeSet
 from models.strategy import AdPlatform
+from models.ids import new_id
 from services.image_gen import image_gen_service, BannerRequest
 
+# Static part of the banner spec prompt, sent ahead of project data so
+# providers can serve it from their prompt cache.
+BANNER_SPEC_INSTRUCTIONS = """Создай технические задания для баннеров.
+
+Для каждого креатива создай спецификацию баннера:
+- creative_id: ID креатива
+- platform: платформа
+- size: размер (например "1080x607")
+- headline: заголовок для баннера
+- text: дополнительный текст (опционально)
+- style_hints: подсказки по стилю (цвета, настроение, элементы)
+- brand_colors: основные цвета бренда (если известны)
+
+Выбирай основной размер для каждой платформы:
+- yandex_direct: 1080x607
+- vk_ads: 1080x607
+
+Создай по одному баннеру на креатив.
+
+Данные для работы приведены ниже."""
+
+
+BANNER_SPEC_TEMPLATE = """БРИФ:
+{brief}
+
+СТРАТЕГИЯ:
+{strategy}
+
+КРЕАТИВЫ (нужны баннеры):
+{creatives}"""
+
+
+BANNER_IMAGE_TEMPLATE = """Рекламный баннер: {headline}
+Стиль: {style_hints}
+Профессиональный, чистый дизайн для рекламы."""
+
+
+REVISE_BANNERS_TEMPLATE = """На основе обратной связи скорректируй спецификации баннеров.
+
+ТЕКУЩИЕ БАННЕРЫ:
+{banners}
+
+ОБРАТНАЯ СВЯЗЬ:
+{feedback}
+
+Обнови спецификации с учётом замечаний."""
+
+
+class BannerSpecList(BaseModel):
+    """LLM output wrapper for banner specifications."""
+
+    specs: list[BannerSpec]
+
 
 class BannerSet(BaseModel):
     """Set of generated banners."""
@@ -18,26 +74,24 @@ class DesignerAgent(BaseAgent):
     name = "designer"
     role = "Art Director / Designer"
 
-    @property
-    def system_prompt(self) -> str:
-        from .prompts import DESIGNER_SYSTEM_PROMPT
-        return DESIGNER_SYSTEM_PROMPT
+    system_prompt = LazyPrompt("DESIGNER_SYSTEM_PROMPT")
 
     async def execute(self, task: AgentTask) -> AgentResponse:
         """Execute designer task."""
-        try:
-            if task.task_type == TaskType.CREATE:
-                result = await self.create_banners(task)
-                return AgentResponse(success=True, output=result)
-            elif task.task_type == TaskType.REVISE:
-                result = await self.revise_banners(task)
-                return AgentResponse(success=True, output=result)
-            else:
-                return AgentResponse(
-                    success=False, error_message=f"Unknown task type: {task.task_type}"
-                )
-        except Exception as e:
-            return AgentResponse(success=False, error_message=str(e))
+        with format_cache_scope():
+            try:
+                if task.task_type == TaskType.CREATE:
+                    result = await self.create_banners(task)
+                    return AgentResponse.model_construct(success=True, output=result)
+                elif task.task_type == TaskType.REVISE:
+                    result = await self.revise_banners(task)
+                    return AgentResponse.model_construct(success=True, output=result)
+                else:
+                    return AgentResponse(
+                        success=False, error_message=f"Unknown task type: {task.task_type}"
+                    )
+            except Exception as e:
+                return AgentResponse(success=False, error_message=str(e))
 
     async def create_banners(self, task: AgentTask) -> BannerSet:
         """Create banners for creatives."""
@@ -46,18 +100,15 @@ class DesignerAgent(BaseAgent):
         strategy = task.context.get("strategy", {})
 
         if not creatives:
-            return BannerSet(banners=[], total_count=0)
+            return BannerSet.model_construct(banners=[], total_count=0)
 
         # Generate banner specs using LLM
         specs = await self._generate_banner_specs(creatives, brief, strategy)
 
         # Generate actual banners
-        banners = []
-        for spec in specs:
-            banner = await self._generate_banner(spec)
-            banners.append(banner)
+        banners = await self._generate_banners(specs)
 
-        return BannerSet(banners=banners, total_count=len(banners))
+        return BannerSet.model_construct(banners=banners, total_count=len(banners))
 
     async def _generate_banner_specs(
         self, creatives: CreativeSet, brief: dict, strategy: dict
@@ -72,53 +123,61 @@ class DesignerAgent(BaseAgent):
         if not visual_creatives:
             return []
 
-        prompt = f"""Создай технические задания для баннеров.
-
-БРИФ:
-{self.format_context({'brief': brief})}
+        # One concurrent request per hypothesis, results kept in hypothesis order
+        by_hypothesis: dict[str, list[Creative]] = {}
+        for c in visual_creatives:
+            by_hypothesis.setdefault(c.hypothesis_id, []).append(c)
 
-СТРАТЕГИЯ:
-{self.format_context({'strategy': strategy})}
-
-КРЕАТИВЫ (нужны баннеры):
-{self.format_context({'creatives': [c.model_dump() for c in visual_creatives]})}
-
-Для каждого креатива создай спецификацию баннера:
-- creative_id: ID креатива
-- platform: платформа
-- size: размер (например "1080x607")
-- headline: заголовок для баннера
-- text: дополнительный текст (опционально)
-- style_hints: подсказки по стилю (цвета, настроение, элементы)
-- brand_colors: основные цвета бренда (если известны)
-
-Выбирай основной размер для каждой платформы:
-- yandex_direct: 1080x607
-- vk_ads: 1080x607
-
-Создай по одному баннеру на креатив."""
+        results = await asyncio.gather(
+            *(self._generate_specs_for(group, brief, strategy) for group in by_hypothesis.values())
+        )
+        return [spec for specs in results for spec in specs]
 
-        class BannerSpecList(BaseModel):
-            specs: list[BannerSpec]
+    async def _generate_specs_for(
+        self, creatives: list[Creative], brief: dict, strategy: dict
+    ) -> list[BannerSpec]:
+        """Generate banner specifications for a group of creatives in one call."""
+        creatives_data = [c.model_dump() for c in creatives]
+        prompt = BANNER_SPEC_TEMPLATE.format(
+            brief=self.format_context({'brief': brief}),
+            strategy=self.format_context({'strategy': strategy}),
+            creatives=self.format_context({'creatives': creatives_data}),
+        )
 
-        result = await self.complete_structured(prompt, BannerSpecList)
+        # Specs follow from the approved copy, so a rerun of this stage reuses them
+        result = await self.complete_structured(
+            prompt, BannerSpecList, cached_prefix=BANNER_SPEC_INSTRUCTIONS, cache=True
+        )
         return result.specs
 
-    async def _generate_banner(self, spec: BannerSpec) -> Banner:
-        """Generate actual banner image."""
-        import uuid
-        from datetime import datetime
+    async def _generate_banners(self, specs: list[BannerSpec]) -> list[Banner]:
+        """Generate banner images for all specs in one batch request."""
+        requests = [self._build_banner_request(spec) for spec in specs]
+        responses = await image_gen_service.generate_batch(requests)
+
+        return [
+            Banner.model_construct(
+                id=new_id(),
+                creative_id=spec.creative_id,
+                spec=spec,
+                image_url=response.image_url,
+                generated_at=datetime.now(timezone.utc).isoformat(),
+            )
+            for spec, response in zip(specs, responses)
+        ]
 
+    def _build_banner_request(self, spec: BannerSpec) -> BannerRequest:
+        """Build image generation request from banner spec."""
         # Parse size
         width, height = map(int, spec.size.split("x"))
 
         # Create prompt for image generation
-        prompt = f"""Рекламный баннер: {spec.headline}
-Стиль: {spec.style_hints}
-Профессиональный, чистый дизайн для рекламы."""
+        prompt = BANNER_IMAGE_TEMPLATE.format(
+            headline=spec.headline,
+            style_hints=spec.style_hints,
+        )
 
-        # Generate via service
-        request = BannerRequest(
+        return BannerRequest(
             prompt=prompt,
             width=width,
             height=height,
@@ -127,16 +186,6 @@ class DesignerAgent(BaseAgent):
             brand_colors=spec.brand_colors,
         )
 
-        response = await image_gen_service.generate_banner(request)
-
-        return Banner(
-            id=str(uuid.uuid4()),
-            creative_id=spec.creative_id,
-            spec=spec,
-            image_url=response.image_url,
-            generated_at=datetime.utcnow().isoformat(),
-        )
-
     async def revise_banners(self, task: AgentTask) -> BannerSet:
         """Revise banners based on feedback."""
         original: BannerSet = task.input_data
@@ -145,25 +194,14 @@ class DesignerAgent(BaseAgent):
         # For now, just regenerate with updated specs
         # In real implementation, would adjust prompts based on feedback
 
-        prompt = f"""На основе обратной связи скорректируй спецификации баннеров.
-
-ТЕКУЩИЕ БАННЕРЫ:
-{self.format_context({'banners': [b.model_dump() for b in original.banners]})}
-
-ОБРАТНАЯ СВЯЗЬ:
-{feedback}
-
-Обнови спецификации с учётом замечаний."""
-
-        class BannerSpecList(BaseModel):
-            specs: list[BannerSpec]
+        prompt = REVISE_BANNERS_TEMPLATE.format(
+            banners=self.format_context({'banners': [b.model_dump() for b in original.banners]}),
+            feedback=feedback,
+        )
 
         result = await self.complete_structured(prompt, BannerSpecList)
 
         # Regenerate banners
-        banners = []
-        for spec in result.specs:
-            banner = await self._generate_banner(spec)
-            banners.append(banner)
+        banners = await self._generate_banners(result.specs)
 
-        return BannerSet(banners=banners, total_count=len(banners))
+        return BannerSet.model_construct(banners=banners, total_count=len(banners))
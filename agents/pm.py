@@ -1,53 +1,23 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
 from pydantic import BaseModel, Field
-from .base import BaseAgent, AgentTask, AgentResponse, ReviewResult, TaskType
+from config import get_settings
+from .base import (
+    BaseAgent,
+    AgentTask,
+    AgentResponse,
+    ReviewResult,
+    TaskType,
+    format_cache_scope,
+    LazyPrompt,
+)
 from models.project import ProjectBrief, ProjectSettings
 from models.artifact import Question
 
-
-class AnalysisResult(BaseModel):
-    """Result of website/channel analysis."""
-
-    brief: ProjectBrief
-    questions: list[Question]
-    initial_observations: str = ""
-
-
-class ProjectManagerAgent(BaseAgent):
-    """Project Manager agent - coordinates the team and communicates with user."""
-
-    name = "project_manager"
-    role = "Project Manager"
-
-    @property
-    def system_prompt(self) -> str:
-        from .prompts import PM_SYSTEM_PROMPT
-        return PM_SYSTEM_PROMPT
-
-    async def execute(self, task: AgentTask) -> AgentResponse:
-        """Execute PM task."""
-        try:
-            if task.task_type == TaskType.ANALYZE:
-                result = await self.analyze_source(task)
-                return AgentResponse(success=True, output=result)
-            elif task.task_type == TaskType.REVIEW:
-                result = await self.review_work(task)
-                return AgentResponse(success=True, output=result)
-            else:
-                return AgentResponse(
-                    success=False, error_message=f"Unknown task type: {task.task_type}"
-                )
-        except Exception as e:
-            return AgentResponse(success=False, error_message=str(e))
-
-    async def analyze_source(self, task: AgentTask) -> AnalysisResult:
-        """Analyze website or Telegram channel."""
-        parsed_data = task.input_data
-
-        prompt = f"""Проанализируй информацию о бизнесе и сформулируй бриф.
+# Prompt templates; per-call data is filled in with str.format
+ANALYZE_SOURCE_TEMPLATE = """Проанализируй информацию о бизнесе и сформулируй бриф.
 
 ДАННЫЕ ПАРСИНГА:
-{self.format_context({'parsed_data': parsed_data})}
+{parsed_data}
 
 На основе этих данных:
 
@@ -75,23 +45,17 @@ class ProjectManagerAgent(BaseAgent):
 
 3. Добавь свои наблюдения в initial_observations"""
 
-        return await self.complete_structured(prompt, AnalysisResult)
-
-    async def review_work(self, task: AgentTask) -> ReviewResult:
-        """Review work from another agent."""
-        work_type = task.context.get("work_type", "unknown")
-        work_content = task.input_data
-        criteria = task.context.get("criteria", [])
+DEFAULT_CRITERIA = "- Общее качество и полнота"
 
-        prompt = f"""Проверь качество работы и дай оценку.
+REVIEW_WORK_TEMPLATE = """Проверь качество работы и дай оценку.
 
 ТИП РАБОТЫ: {work_type}
 
 СОДЕРЖИМОЕ:
-{self.format_context({'content': work_content})}
+{content}
 
 КРИТЕРИИ ОЦЕНКИ:
-{chr(10).join(f'- {c}' for c in criteria) if criteria else '- Общее качество и полнота'}
+{criteria}
 
 Оцени работу по шкале 0-10.
 - 8-10: Отлично, можно принимать
@@ -100,16 +64,10 @@ class ProjectManagerAgent(BaseAgent):
 
 Если оценка ниже 8, укажи конкретные проблемы и инструкции по исправлению."""
 
-        return await self.complete_structured(prompt, ReviewResult)
-
-    async def generate_final_summary(self, task: AgentTask) -> str:
-        """Generate final package summary for user."""
-        context = task.context
-
-        prompt = f"""Подготовь финальное резюме рекламного пакета для клиента.
+FINAL_SUMMARY_TEMPLATE = """Подготовь финальное резюме рекламного пакета для клиента.
 
 ДАННЫЕ ПРОЕКТА:
-{self.format_context(context)}
+{context}
 
 Составь краткое, профессиональное резюме:
 1. Что было сделано
@@ -120,4 +78,82 @@ class ProjectManagerAgent(BaseAgent):
 
 Пиши кратко и по делу."""
 
-        return await self.complete(prompt)
+
+class AnalysisResult(BaseModel):
+    """Result of website/channel analysis."""
+
+    brief: ProjectBrief
+    questions: list[Question]
+    initial_observations: str = ""
+
+
+class ProjectManagerAgent(BaseAgent):
+    """Project Manager agent - coordinates the team and communicates with user."""
+
+    name = "project_manager"
+    role = "Project Manager"
+
+    system_prompt = LazyPrompt("PM_SYSTEM_PROMPT")
+
+    async def execute(self, task: AgentTask) -> AgentResponse:
+        """Execute PM task."""
+        with format_cache_scope():
+            try:
+                if task.task_type == TaskType.ANALYZE:
+                    result = await self.analyze_source(task)
+                    return AgentResponse.model_construct(success=True, output=result)
+                elif task.task_type == TaskType.REVIEW:
+                    result = await self.review_work(task)
+                    return AgentResponse.model_construct(success=True, output=result)
+                else:
+                    return AgentResponse(
+                        success=False, error_message=f"Unknown task type: {task.task_type}"
+                    )
+            except Exception as e:
+                return AgentResponse(success=False, error_message=str(e))
+
+    async def analyze_source(self, task: AgentTask) -> AnalysisResult:
+        """Analyze website or Telegram channel."""
+        parsed_data = task.input_data
+
+        prompt = ANALYZE_SOURCE_TEMPLATE.format(
+            parsed_data=self.format_context({'parsed_data': parsed_data}),
+        )
+
+        # The analysis depends only on the parsed page, so reruns and retries reuse it
+        return await self.complete_structured(prompt, AnalysisResult, cache=True)
+
+    async def review_work(self, task: AgentTask) -> ReviewResult:
+        """Review work from another agent."""
+        work_type = task.context.get("work_type", "unknown")
+        work_content = task.input_data
+        criteria = task.context.get("criteria", [])
+
+        prompt = REVIEW_WORK_TEMPLATE.format(
+            work_type=work_type,
+            content=self.format_context({'content': work_content}),
+            criteria="\n".join(f"- {c}" for c in criteria) if criteria else DEFAULT_CRITERIA,
+        )
+
+        return await self.complete_structured(
+            prompt, ReviewResult, model=self._model_for(task)
+        )
+
+    async def generate_final_summary(self, task: AgentTask) -> str:
+        """Generate final package summary for user."""
+        return "".join([delta async for delta in self.stream_final_summary(task)])
+
+    async def stream_final_summary(self, task: AgentTask) -> AsyncIterator[str]:
+        """Stream final package summary for user as it is generated."""
+        context = task.context
+
+        prompt = FINAL_SUMMARY_TEMPLATE.format(context=self.format_context(context))
+
+        async for delta in self.stream(prompt, model=self._model_for(task)):
+            yield delta
+
+    def _model_for(self, task: AgentTask) -> Optional[str]:
+        """Route low-priority tasks to the cheaper fast model."""
+        if task.context.get("priority") == "low":
+            return get_settings().llm_model_fast
+        return None
@@ -1,50 +1,11 @@
 from pydantic import BaseModel, Field
-from .base import BaseAgent, AgentTask, AgentResponse, TaskType
+from .base import BaseAgent, AgentTask, AgentResponse, TaskType, format_cache_scope, LazyPrompt
 from models.strategy import Strategy, Hypothesis, HypothesesArtifact, AdPlatform
 
 
-class StrategistAgent(BaseAgent):
-    """Strategist agent - develops marketing strategy and hypotheses."""
-
-    name = "strategist"
-    role = "Marketing Strategist"
-
-    @property
-    def system_prompt(self) -> str:
-        from .prompts import STRATEGIST_SYSTEM_PROMPT
-        return STRATEGIST_SYSTEM_PROMPT
-
-    async def execute(self, task: AgentTask) -> AgentResponse:
-        """Execute strategist task."""
-        try:
-            if task.task_type == TaskType.CREATE:
-                if task.context.get("output_type") == "hypotheses":
-                    result = await self.create_hypotheses(task)
-                else:
-                    result = await self.create_strategy(task)
-                return AgentResponse(success=True, output=result)
-            elif task.task_type == TaskType.REVISE:
-                result = await self.revise_work(task)
-                return AgentResponse(success=True, output=result)
-            else:
-                return AgentResponse(
-                    success=False, error_message=f"Unknown task type: {task.task_type}"
-                )
-        except Exception as e:
-            return AgentResponse(success=False, error_message=str(e))
-
-    async def create_strategy(self, task: AgentTask) -> Strategy:
-        """Create marketing strategy based on brief."""
-        brief = task.context.get("brief", {})
-        settings = task.context.get("settings", {})
-
-        prompt = f"""Разработай маркетинговую стратегию для рекламной кампании.
-
-БРИФ:
-{self.format_context({'brief': brief})}
-
-НАСТРОЙКИ КЛИЕНТА:
-{self.format_context({'settings': settings})}
+# Static parts of the strategist prompts, sent ahead of per-project data so
+# providers can serve them from their prompt cache.
+STRATEGY_INSTRUCTIONS = """Разработай маркетинговую стратегию для рекламной кампании.
 
 Создай стратегию, включающую:
 
@@ -81,22 +42,10 @@ class StrategistAgent(BaseAgent):
 
 8. success_metrics: Метрики успеха (3-5 штук)
 
-Учитывай бюджет клиента при распределении и количестве креативов."""
-
-        return await self.complete_structured(prompt, Strategy)
-
-    async def create_hypotheses(self, task: AgentTask) -> HypothesesArtifact:
-        """Create testing hypotheses based on strategy."""
-        strategy = task.context.get("strategy", {})
-        brief = task.context.get("brief", {})
-
-        prompt = f"""На основе стратегии сформулируй гипотезы для тестирования.
+Учитывай бюджет клиента при распределении и количестве креативов.
+Данные для работы приведены ниже."""
 
-СТРАТЕГИЯ:
-{self.format_context({'strategy': strategy})}
-
-БРИФ:
-{self.format_context({'brief': brief})}
+HYPOTHESES_INSTRUCTIONS = """На основе стратегии сформулируй гипотезы для тестирования.
 
 Создай список гипотез для A/B тестирования:
 
@@ -119,9 +68,95 @@ class StrategistAgent(BaseAgent):
 
 Также укажи:
 - total_creatives: общее количество креативов
-- rationale: обоснование выбора гипотез"""
+- rationale: обоснование выбора гипотез
 
-        return await self.complete_structured(prompt, HypothesesArtifact)
+Данные для работы приведены ниже."""
+
+REVISE_INSTRUCTIONS = """Доработай материал на основе обратной связи.
+
+Внеси необходимые изменения, сохраняя общую структуру.
+Учти все замечания и улучши качество.
+
+Контекст проекта, исходный материал и обратная связь приведены ниже."""
+
+CREATE_STRATEGY_TEMPLATE = """БРИФ:
+{brief}
+
+НАСТРОЙКИ КЛИЕНТА:
+{settings}"""
+
+CREATE_HYPOTHESES_TEMPLATE = """СТРАТЕГИЯ:
+{strategy}
+
+БРИФ:
+{brief}"""
+
+REVISE_PREFIX_TEMPLATE = REVISE_INSTRUCTIONS + """
+
+{context}"""
+
+REVISE_TEMPLATE = """ИСХОДНЫЙ МАТЕРИАЛ:
+{original}
+
+ОБРАТНАЯ СВЯЗЬ:
+{feedback}"""
+
+
+class StrategistAgent(BaseAgent):
+    """Strategist agent - develops marketing strategy and hypotheses."""
+
+    name = "strategist"
+    role = "Marketing Strategist"
+
+    system_prompt = LazyPrompt("STRATEGIST_SYSTEM_PROMPT")
+
+    async def execute(self, task: AgentTask) -> AgentResponse:
+        """Execute strategist task."""
+        with format_cache_scope():
+            try:
+                if task.task_type == TaskType.CREATE:
+                    if task.context.get("output_type") == "hypotheses":
+                        result = await self.create_hypotheses(task)
+                    else:
+                        result = await self.create_strategy(task)
+                    return AgentResponse.model_construct(success=True, output=result)
+                elif task.task_type == TaskType.REVISE:
+                    result = await self.revise_work(task)
+                    return AgentResponse.model_construct(success=True, output=result)
+                else:
+                    return AgentResponse(
+                        success=False, error_message=f"Unknown task type: {task.task_type}"
+                    )
+            except Exception as e:
+                return AgentResponse(success=False, error_message=str(e))
+
+    async def create_strategy(self, task: AgentTask) -> Strategy:
+        """Create marketing strategy based on brief."""
+        brief = task.context.get("brief", {})
+        settings = task.context.get("settings", {})
+
+        prompt = CREATE_STRATEGY_TEMPLATE.format(
+            brief=self.format_context({'brief': brief}),
+            settings=self.format_context({'settings': settings}),
+        )
+
+        return await self.complete_structured(
+            prompt, Strategy, cached_prefix=STRATEGY_INSTRUCTIONS
+        )
+
+    async def create_hypotheses(self, task: AgentTask) -> HypothesesArtifact:
+        """Create testing hypotheses based on strategy."""
+        strategy = task.context.get("strategy", {})
+        brief = task.context.get("brief", {})
+
+        prompt = CREATE_HYPOTHESES_TEMPLATE.format(
+            strategy=self.format_context({'strategy': strategy}),
+            brief=self.format_context({'brief': brief}),
+        )
+
+        return await self.complete_structured(
+            prompt, HypothesesArtifact, cached_prefix=HYPOTHESES_INSTRUCTIONS
+        )
 
     async def revise_work(self, task: AgentTask) -> Strategy | HypothesesArtifact:
         """Revise strategy or hypotheses based on feedback."""
@@ -129,18 +164,21 @@ class StrategistAgent(BaseAgent):
         feedback = task.context.get("feedback", "")
         output_type = task.context.get("output_type", "strategy")
 
-        prompt = f"""Доработай материал на основе обратной связи.
-
-ИСХОДНЫЙ МАТЕРИАЛ:
-{self.format_context({'original': original})}
-
-ОБРАТНАЯ СВЯЗЬ:
-{feedback}
+        # Brief (and strategy for hypotheses) stay byte-identical across revisions,
+        # so they go into the cached prefix; only the draft and feedback change.
+        stable = {"brief": task.context.get("brief", {})}
+        if output_type == "hypotheses":
+            stable["strategy"] = task.context.get("strategy", {})
+        cached_prefix = REVISE_PREFIX_TEMPLATE.format(context=self.format_context(stable))
 
-Внеси необходимые изменения, сохраняя общую структуру.
-Учти все замечания и улучши качество."""
+        prompt = REVISE_TEMPLATE.format(
+            original=self.format_context({'original': original}),
+            feedback=feedback,
+        )
 
         if output_type == "hypotheses":
-            return await self.complete_structured(prompt, HypothesesArtifact)
+            return await self.complete_structured(
+                prompt, HypothesesArtifact, cached_prefix=cached_prefix
+            )
         else:
-            return await self.complete_structured(prompt, Strategy)
+            return await self.complete_structured(prompt, Strategy, cached_prefix=cached_prefix)
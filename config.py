@@ -1,4 +1,4 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
 
@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
     llm_model_main: str = "anthropic/claude-sonnet-4"
     llm_model_fast: str = "anthropic/claude-haiku-4.5"
+    # Run PM draft reviews on the fast model: cheaper, but a weaker quality gate
+    llm_fast_reviews: bool = False
 
     # Database
     database_url: str = "sqlite+aiosqlite:///./adflow.db"
@@ -24,9 +26,18 @@ class Settings(BaseSettings):
     max_creatives_per_project: int = 100
     max_retries_per_stage: int = 3
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    # Concurrency
+    llm_concurrency: int = 8
+    image_gen_concurrency: int = 8
+    pipeline_workers: int = 4
+    # Drafts created and reviewed concurrently on the first round; 1 = serial
+    parallel_drafts: int = 1
+
+    # LLM response cache
+    llm_cache_enabled: bool = True
+    llm_cache_ttl: int = 3600
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
 @lru_cache
@@ -1,20 +1,130 @@
-import uuid
-from datetime import datetime
-from typing import Optional, Callable, Any
-from pydantic import BaseModel
-
+import asyncio
+import inspect
+import logging
+import re
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional, Callable, Any, AsyncIterator, Awaitable
+from pydantic import BaseModel, TypeAdapter
+from config import get_settings
 from models.project import Project, ProjectStatus, ProjectBrief, ProjectSettings
-from models.artifact import Artifact, ArtifactType, ArtifactStatus, ClientInterview, QuestionsArtifact
+from models.artifact import Artifact, ArtifactType, ArtifactStatus, ClientInterview, Question
 from models.strategy import Strategy, HypothesesArtifact
 from models.creative import CreativeSet
-from agents.base import AgentTask, TaskType, ReviewResult
+from models.ids import new_id
+from agents.base import (
+    AgentTask,
+    AgentResponse,
+    TaskType,
+    ReviewResult,
+    format_cache_scope,
+    independent_calls,
+    report_fields_to,
+)
 from agents.pm import ProjectManagerAgent, AnalysisResult
 from agents.strategist import StrategistAgent
 from agents.copywriter import CopywriterAgent
-from agents.designer import DesignerAgent, BannerSet
+from agents.designer import DesignerAgent, BannerSet, BannerSpecList
+from services.llm import warm_schemas
 from services.parser import parser_service
 from routes.artifacts import save_artifact, get_latest_artifact
 
+logger = logging.getLogger(__name__)
+
+# Structured-output schemas are rendered into every agent prompt; build them at
+# import so the first pipeline run doesn't pay for it.
+warm_schemas(
+    AnalysisResult, ReviewResult, Strategy, HypothesesArtifact, CreativeSet, BannerSpecList
+)
+
+# Dumps a whole question list in one serializer pass
+_questions_adapter = TypeAdapter(list[Question])
+
+# Per-pipeline memo of model dumps, so brief/strategy/interview are dumped once
+# and every stage context shares the same dicts
+_dump_memo: ContextVar[Optional[dict[int, tuple[BaseModel, dict]]]] = ContextVar(
+    "dump_memo", default=None
+)
+
+
+def _dump_once(model: Optional[BaseModel]) -> dict:
+    """Dump a model to JSON-compatible data, reusing the result within a pipeline run."""
+    if model is None:
+        return {}
+    memo = _dump_memo.get()
+    if memo is None:
+        return model.model_dump(mode="json")
+    entry = memo.get(id(model))
+    if entry is None or entry[0] is not model:
+        entry = memo[id(model)] = (model, model.model_dump(mode="json"))
+    return entry[1]
+
+# Marks an answer that could not be coerced and should be left at its default
+_SKIP = object()
+
+_CSV_SEPARATOR = re.compile(r"\s*,\s*")
+
+# Telegram formats are text-only and never need banners
+_BANNERLESS_PLATFORMS = frozenset({"telegram_ads", "telegram_seeding"})
+
+
+def _to_int(value: Any) -> Any:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return _SKIP
+
+
+def _to_text(value: Any) -> Any:
+    return _SKIP if value is None else str(value)
+
+
+def _to_csv_list(value: Any) -> Any:
+    """Accept a list or a comma-separated string."""
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    if isinstance(value, str):
+        return [v for v in _CSV_SEPARATOR.split(value.strip()) if v]
+    return _SKIP
+
+
+def _to_list(value: Any) -> Any:
+    """Accept a list or wrap a single non-empty value."""
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [str(value)] if value else _SKIP
+
+
+def _to_flag(value: Any) -> bool:
+    return value in [True, "true", "yes", "да", "1"]
+
+
+# Answer key -> (ClientInterview field, coercer)
+_ANSWER_FIELDS: dict[str, tuple[str, Callable[[Any], Any]]] = {
+    # Budget
+    "budget": ("budget_monthly", _to_int),
+    "budget_type": ("budget_type", _to_text),
+    # Goals
+    "primary_goal": ("primary_goal", _to_text),
+    "goals": ("secondary_goals", _to_csv_list),
+    "target_cpa": ("target_cpa", _to_int),
+    # Audience
+    "target_audience": ("target_audience_description", _to_text),
+    "geo": ("geo", _to_csv_list),
+    "age_range": ("age_range", _to_text),
+    "gender": ("gender", _to_text),
+    # Channel preferences
+    "preferred_platforms": ("preferred_platforms", _to_csv_list),
+    "excluded_platforms": ("excluded_platforms", _to_csv_list),
+    "has_telegram_channel": ("has_telegram_channel", _to_flag),
+    "telegram_channel_url": ("telegram_channel_url", _to_text),
+    # Restrictions and experience
+    "restrictions": ("restrictions", _to_list),
+    "previous_experience": ("previous_experience", _to_text),
+    "what_worked": ("what_worked_before", _to_text),
+    "what_failed": ("what_failed_before", _to_text),
+}
+
 
 class PipelineStage(BaseModel):
     """A stage in the pipeline."""
@@ -37,7 +147,24 @@ class Orchestrator:
         self.designer = DesignerAgent()
 
         self.max_revisions = 3
+        self.parallel_drafts = get_settings().parallel_drafts
         self.event_callbacks: list[Callable] = []
+        # Async callbacks run in the background; keep references until they finish
+        self._pending_events: set[asyncio.Task] = set()
+        self._event_semaphore = asyncio.Semaphore(64)
+        # One bounded queue of event batches per subscribe() consumer
+        self._subscribers: list[asyncio.Queue[list[tuple[str, Any]]]] = []
+        # Events emitted within one loop iteration, delivered together
+        self._event_buffer: list[tuple[str, Any]] = []
+        self._flush_scheduled = False
+        # Per-project change signals for status streams; replaced after each set
+        self._project_changes: dict[str, asyncio.Event] = {}
+
+        # Pipeline runs queued by the API, executed by start_workers() workers
+        self._pipeline_queue: asyncio.Queue[tuple[Callable[..., Awaitable], tuple]] = (
+            asyncio.Queue()
+        )
+        self._workers: list[asyncio.Task] = []
 
         # Storage for waiting projects (waiting for user answers)
         self.waiting_projects: dict[str, dict] = {}
@@ -46,11 +173,121 @@ class Orchestrator:
         """Register event callback."""
         self.event_callbacks.append(callback)
 
+    async def subscribe(self, maxsize: int = 1000) -> AsyncIterator[list[tuple[str, Any]]]:
+        """Yield batches of ``(event_type, data)`` pipeline events.
+
+        Each batch holds the events emitted within one event loop iteration, so
+        a consumer such as an SSE stream can write them in one go. Each subscriber
+        pulls from its own bounded queue; batches are dropped for a subscriber
+        whose queue is full, so a slow consumer never stalls the pipeline.
+        """
+        queue: asyncio.Queue[list[tuple[str, Any]]] = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.remove(queue)
+
+    def enqueue(self, job: Callable[..., Awaitable], *args: Any):
+        """Queue a pipeline coroutine (e.g. ``run_pipeline``) to run on a worker."""
+        self._pipeline_queue.put_nowait((job, args))
+
+    def start_workers(self, count: int):
+        """Start the workers that run queued pipelines, at most ``count`` at once."""
+        for _ in range(count):
+            self._workers.append(asyncio.create_task(self._pipeline_worker()))
+
+    async def stop_workers(self):
+        """Cancel the pipeline workers and wait for them to exit."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    async def _pipeline_worker(self):
+        while True:
+            job, args = await self._pipeline_queue.get()
+            try:
+                await job(*args)
+            except Exception:
+                # Pipelines record their own failures on the project; this catches the rest
+                logger.exception("Pipeline job %s failed", getattr(job, "__name__", job))
+            finally:
+                self._pipeline_queue.task_done()
+
+    def project_changed(self, project_id: str) -> asyncio.Event:
+        """Get an event that is set on the project's next status change.
+
+        Take the event before reading the project state so a change made in
+        between still wakes the waiter.
+        """
+        event = self._project_changes.get(project_id)
+        if event is None:
+            event = self._project_changes[project_id] = asyncio.Event()
+        return event
+
+    def notify_project(self, project_id: str):
+        """Wake everything waiting on a change to the project's status."""
+        event = self._project_changes.pop(project_id, None)
+        if event is not None:
+            event.set()
+
+    def _set_status(self, project: Project, status: ProjectStatus, stage: Optional[int] = None):
+        """Move a project to a new status (and stage) and notify its watchers."""
+        project.status = status
+        if stage is not None:
+            project.current_stage = stage
+        self.notify_project(project.id)
+
     def _emit_event(self, event_type: str, data: Any):
-        """Emit event to all callbacks."""
-        for cb in self.event_callbacks:
+        """Queue an event for delivery at the end of the current loop iteration."""
+        self._event_buffer.append((event_type, data))
+        if self._flush_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_events()
+            return
+        self._flush_scheduled = True
+        loop.call_soon(self._flush_events)
+
+    def _flush_events(self):
+        """Deliver buffered events to subscribers and callbacks.
+
+        Consecutive duplicates are sent once. Sync callbacks run inline so they
+        see events in order; coroutine callbacks are scheduled without blocking.
+        """
+        self._flush_scheduled = False
+        batch: list[tuple[str, Any]] = []
+        for event in self._event_buffer:
+            if not batch or batch[-1] != event:
+                batch.append(event)
+        self._event_buffer = []
+
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(batch)
+            except asyncio.QueueFull:
+                pass
+        for event_type, data in batch:
+            for cb in self.event_callbacks:
+                if inspect.iscoroutinefunction(cb):
+                    task = asyncio.create_task(self._dispatch_event(cb, event_type, data))
+                    self._pending_events.add(task)
+                    task.add_done_callback(self._pending_events.discard)
+                    continue
+                try:
+                    cb(event_type, data)
+                except Exception:
+                    pass
+
+    async def _dispatch_event(self, cb: Callable, event_type: str, data: Any):
+        """Run an async event callback, bounded and with errors swallowed."""
+        async with self._event_semaphore:
             try:
-                cb(event_type, data)
+                await cb(event_type, data)
             except Exception:
                 pass
 
@@ -58,8 +295,7 @@ class Orchestrator:
         """Run the full creative generation pipeline."""
         try:
             # Stage 1: Analyze source
-            project.status = ProjectStatus.ANALYZING
-            project.current_stage = 1
+            self._set_status(project, ProjectStatus.ANALYZING, 1)
             self._emit_event("stage_start", {"stage": 1, "name": "analyzing"})
 
             analysis = await self._stage_analyze(project)
@@ -67,11 +303,10 @@ class Orchestrator:
 
             # Stage 2: Wait for user answers (if questions)
             if analysis.questions:
-                project.status = ProjectStatus.QUESTIONS
-                project.current_stage = 2
+                self._set_status(project, ProjectStatus.QUESTIONS, 2)
                 self._emit_event("questions_ready", {
                     "project_id": project.id,
-                    "questions": [q.model_dump() for q in analysis.questions]
+                    "questions": _questions_adapter.dump_python(analysis.questions)
                 })
 
                 # Store analysis for later continuation
@@ -88,13 +323,15 @@ class Orchestrator:
             await self._continue_pipeline(project, interview)
 
         except Exception as e:
-            project.status = ProjectStatus.FAILED
             project.error_message = str(e)
+            self._set_status(project, ProjectStatus.FAILED)
             self._emit_event("pipeline_error", {"error": str(e)})
             raise
 
     async def continue_after_answers(self, project: Project, answers: dict):
         """Continue pipeline after user submits answers."""
+        # Resume works from the project and its artifacts; drop the parked analysis
+        self.waiting_projects.pop(project.id, None)
         try:
             # Parse answers into ClientInterview structure
             interview = self._parse_answers_to_interview(answers)
@@ -109,8 +346,8 @@ class Orchestrator:
                 questions_artifact.status = ArtifactStatus.APPROVED
                 save_artifact(questions_artifact)
 
-            # Store interview in project settings
-            project.settings = ProjectSettings(
+            # Store interview in project settings (built from the validated interview)
+            project.settings = ProjectSettings.model_construct(
                 budget_monthly=interview.budget_monthly or 50000,
                 goals=[interview.primary_goal] + interview.secondary_goals,
                 target_audience_description=interview.target_audience_description,
@@ -120,134 +357,65 @@ class Orchestrator:
             await self._continue_pipeline(project, interview)
 
         except Exception as e:
-            project.status = ProjectStatus.FAILED
             project.error_message = str(e)
+            self._set_status(project, ProjectStatus.FAILED)
             self._emit_event("pipeline_error", {"error": str(e)})
             raise
 
     def _parse_answers_to_interview(self, answers: dict) -> ClientInterview:
         """Parse user answers into ClientInterview structure."""
-        interview = ClientInterview()
-
-        # Parse budget
-        if "budget" in answers:
-            try:
-                interview.budget_monthly = int(answers["budget"])
-            except (ValueError, TypeError):
-                pass
-
-        if "budget_type" in answers:
-            interview.budget_type = answers["budget_type"]
-
-        # Parse goals
-        if "primary_goal" in answers:
-            interview.primary_goal = answers["primary_goal"]
-
-        if "goals" in answers:
-            if isinstance(answers["goals"], list):
-                interview.secondary_goals = answers["goals"]
-            else:
-                interview.secondary_goals = [g.strip() for g in answers["goals"].split(",")]
-
-        if "target_cpa" in answers:
-            try:
-                interview.target_cpa = int(answers["target_cpa"])
-            except (ValueError, TypeError):
-                pass
-
-        # Parse audience
-        if "target_audience" in answers:
-            interview.target_audience_description = answers["target_audience"]
-
-        if "geo" in answers:
-            if isinstance(answers["geo"], list):
-                interview.geo = answers["geo"]
-            else:
-                interview.geo = [g.strip() for g in answers["geo"].split(",")]
-
-        if "age_range" in answers:
-            interview.age_range = answers["age_range"]
-
-        if "gender" in answers:
-            interview.gender = answers["gender"]
-
-        # Parse channel preferences
-        if "preferred_platforms" in answers:
-            if isinstance(answers["preferred_platforms"], list):
-                interview.preferred_platforms = answers["preferred_platforms"]
-            else:
-                interview.preferred_platforms = [p.strip() for p in answers["preferred_platforms"].split(",")]
-
-        if "excluded_platforms" in answers:
-            if isinstance(answers["excluded_platforms"], list):
-                interview.excluded_platforms = answers["excluded_platforms"]
-            else:
-                interview.excluded_platforms = [p.strip() for p in answers["excluded_platforms"].split(",")]
-
-        if "has_telegram_channel" in answers:
-            interview.has_telegram_channel = answers["has_telegram_channel"] in [True, "true", "yes", "да", "1"]
-
-        if "telegram_channel_url" in answers:
-            interview.telegram_channel_url = answers["telegram_channel_url"]
-
-        # Parse restrictions and experience
-        if "restrictions" in answers:
-            if isinstance(answers["restrictions"], list):
-                interview.restrictions = answers["restrictions"]
-            elif answers["restrictions"]:
-                interview.restrictions = [answers["restrictions"]]
-
-        if "previous_experience" in answers:
-            interview.previous_experience = answers["previous_experience"]
-
-        if "what_worked" in answers:
-            interview.what_worked_before = answers["what_worked"]
-
-        if "what_failed" in answers:
-            interview.what_failed_before = answers["what_failed"]
-
-        return interview
+        fields = {}
+        for key, (field, coerce) in _ANSWER_FIELDS.items():
+            if key in answers:
+                value = coerce(answers[key])
+                if value is not _SKIP:
+                    fields[field] = value
+        return ClientInterview.model_validate(fields)
 
     async def _continue_pipeline(self, project: Project, interview: ClientInterview):
         """Continue pipeline after questions stage."""
+        token = _dump_memo.set({})
+        try:
+            # Stage 3: Create strategy (with interview data!)
+            self._set_status(project, ProjectStatus.STRATEGY, 3)
+            self._emit_event("stage_start", {"stage": 3, "name": "strategy"})
 
-        # Stage 3: Create strategy (with interview data!)
-        project.status = ProjectStatus.STRATEGY
-        project.current_stage = 3
-        self._emit_event("stage_start", {"stage": 3, "name": "strategy"})
-
-        strategy = await self._stage_strategy(project, interview)
+            strategy, hypotheses_attempt = await self._stage_strategy(project, interview)
 
-        # Stage 4: Create hypotheses
-        project.status = ProjectStatus.HYPOTHESES
-        project.current_stage = 4
-        self._emit_event("stage_start", {"stage": 4, "name": "hypotheses"})
+            # Stage 4: Create hypotheses
+            self._set_status(project, ProjectStatus.HYPOTHESES, 4)
+            self._emit_event("stage_start", {"stage": 4, "name": "hypotheses"})
 
-        hypotheses = await self._stage_hypotheses(project, strategy, interview)
+            hypotheses, copy_attempt = await self._stage_hypotheses(
+                project, strategy, interview, first_attempt=hypotheses_attempt
+            )
 
-        # Stage 5: Create copy (unique per channel!)
-        project.status = ProjectStatus.COPYWRITING
-        project.current_stage = 5
-        self._emit_event("stage_start", {"stage": 5, "name": "copywriting"})
+            # Stage 5: Create copy (unique per channel!)
+            self._set_status(project, ProjectStatus.COPYWRITING, 5)
+            self._emit_event("stage_start", {"stage": 5, "name": "copywriting"})
 
-        creatives = await self._stage_copywriting(project, strategy, hypotheses)
+            creatives, design_attempt = await self._stage_copywriting(
+                project, strategy, hypotheses, first_attempt=copy_attempt
+            )
 
-        # Stage 6: Create banners (only for platforms that need them)
-        project.status = ProjectStatus.DESIGN
-        project.current_stage = 6
-        self._emit_event("stage_start", {"stage": 6, "name": "design"})
+            # Stage 6: Create banners (only for platforms that need them)
+            self._set_status(project, ProjectStatus.DESIGN, 6)
+            self._emit_event("stage_start", {"stage": 6, "name": "design"})
 
-        banners = await self._stage_design(project, strategy, creatives)
+            banners = await self._stage_design(
+                project, strategy, creatives, first_attempt=design_attempt
+            )
 
-        # Stage 7: Finalize
-        project.status = ProjectStatus.COMPLETED
-        project.current_stage = 7
-        self._emit_event("pipeline_complete", {"project_id": project.id})
+            # Stage 7: Finalize
+            self._set_status(project, ProjectStatus.COMPLETED, 7)
+            self._emit_event("pipeline_complete", {"project_id": project.id})
+        finally:
+            _dump_memo.reset(token)
 
     async def _stage_analyze(self, project: Project) -> AnalysisResult:
         """Stage 1: Analyze website/channel."""
-        # Parse the source
-        parsed = await parser_service.parse(project.url)
+        # Parse the source while the PM's LLM connection is being opened
+        parsed, _ = await asyncio.gather(parser_service.parse(project.url), self.pm.warmup())
 
         # PM analyzes
         task = AgentTask(
@@ -262,44 +430,54 @@ class Orchestrator:
 
         result: AnalysisResult = response.output
 
-        # Save artifact
-        artifact = Artifact(
-            id=str(uuid.uuid4()),
+        # Save artifact (fields are built here, so validation is skipped)
+        now = datetime.now(timezone.utc)
+        artifact = Artifact.model_construct(
+            id=new_id(),
             project_id=project.id,
             type=ArtifactType.BRIEF,
             status=ArtifactStatus.APPROVED,
             content=result.brief.model_dump(),
             agent_name=self.pm.name,
+            created_at=now,
+            updated_at=now,
         )
         save_artifact(artifact)
 
         if result.questions:
-            questions_artifact = Artifact(
-                id=str(uuid.uuid4()),
+            questions_artifact = Artifact.model_construct(
+                id=new_id(),
                 project_id=project.id,
                 type=ArtifactType.QUESTIONS,
                 status=ArtifactStatus.PENDING,
-                content={"questions": [q.model_dump() for q in result.questions]},
+                content={"questions": _questions_adapter.dump_python(result.questions)},
                 agent_name=self.pm.name,
+                created_at=now,
+                updated_at=now,
             )
             save_artifact(questions_artifact)
 
         return result
 
-    async def _stage_strategy(self, project: Project, interview: ClientInterview) -> Strategy:
-        """Stage 2: Create marketing strategy based on interview."""
+    async def _stage_strategy(
+        self, project: Project, interview: ClientInterview
+    ) -> tuple[Strategy, Optional[asyncio.Task]]:
+        """Stage 2: Create marketing strategy based on interview.
+
+        Also returns the hypotheses draft started speculatively during review.
+        """
         task = AgentTask(
             task_type=TaskType.CREATE,
             description="Create marketing strategy based on client interview",
             context={
-                "brief": project.brief.model_dump() if project.brief else {},
-                "interview": interview.model_dump(),  # Full interview data!
-                "settings": project.settings.model_dump() if project.settings else {},
+                "brief": _dump_once(project.brief),
+                "interview": _dump_once(interview),  # Full interview data!
+                "settings": _dump_once(project.settings),
             },
         )
 
         # Create strategy with review loop
-        strategy = await self._create_with_review(
+        return await self._create_with_review(
             agent=self.strategist,
             task=task,
             artifact_type=ArtifactType.STRATEGY,
@@ -311,28 +489,40 @@ class Orchestrator:
                 "Правильный выбор площадок с учётом интервью",
                 "Чёткая сегментация аудитории",
             ],
+            speculate=lambda strategy: self.strategist.execute(
+                self._hypotheses_task(project, strategy, interview)
+            ),
         )
 
-        return strategy
-
-    async def _stage_hypotheses(
+    def _hypotheses_task(
         self, project: Project, strategy: Strategy, interview: ClientInterview
-    ) -> HypothesesArtifact:
-        """Stage 3: Create testing hypotheses."""
-        task = AgentTask(
+    ) -> AgentTask:
+        """Build the hypotheses task for a strategy."""
+        return AgentTask(
             task_type=TaskType.CREATE,
             description="Create testing hypotheses for selected channels",
             context={
                 "output_type": "hypotheses",
-                "strategy": strategy.model_dump(),
-                "interview": interview.model_dump(),
-                "brief": project.brief.model_dump() if project.brief else {},
+                "strategy": _dump_once(strategy),
+                "interview": _dump_once(interview),
+                "brief": _dump_once(project.brief),
             },
         )
 
-        hypotheses = await self._create_with_review(
+    async def _stage_hypotheses(
+        self,
+        project: Project,
+        strategy: Strategy,
+        interview: ClientInterview,
+        first_attempt: Optional[asyncio.Task] = None,
+    ) -> tuple[HypothesesArtifact, Optional[asyncio.Task]]:
+        """Stage 3: Create testing hypotheses.
+
+        Also returns the copy draft started speculatively during review.
+        """
+        return await self._create_with_review(
             agent=self.strategist,
-            task=task,
+            task=self._hypotheses_task(project, strategy, interview),
             artifact_type=ArtifactType.HYPOTHESES,
             project_id=project.id,
             review_criteria=[
@@ -342,27 +532,48 @@ class Orchestrator:
                 "Правильное распределение по платформам",
                 "Учёт особенностей каждого канала",
             ],
+            first_attempt=first_attempt,
+            speculate=lambda hypotheses: self.copywriter.execute(
+                self._copywriting_task(project, strategy, hypotheses)
+            ),
         )
 
-        return hypotheses
-
-    async def _stage_copywriting(
+    def _copywriting_task(
         self, project: Project, strategy: Strategy, hypotheses: HypothesesArtifact
-    ) -> CreativeSet:
-        """Stage 4: Create ad copy unique for each channel."""
-        task = AgentTask(
+    ) -> AgentTask:
+        """Build the copywriting task for a set of hypotheses."""
+        return AgentTask(
             task_type=TaskType.CREATE,
             description="Create channel-specific ad copy for all hypotheses",
             context={
-                "hypotheses": hypotheses.model_dump(),
-                "strategy": strategy.model_dump(),
-                "brief": project.brief.model_dump() if project.brief else {},
+                "hypotheses": _dump_once(hypotheses),
+                "strategy": _dump_once(strategy),
+                "brief": _dump_once(project.brief),
             },
         )
 
-        creatives = await self._create_with_review(
+    async def _stage_copywriting(
+        self,
+        project: Project,
+        strategy: Strategy,
+        hypotheses: HypothesesArtifact,
+        first_attempt: Optional[asyncio.Task] = None,
+    ) -> tuple[CreativeSet, Optional[asyncio.Task]]:
+        """Stage 4: Create ad copy unique for each channel.
+
+        Also returns the banner draft started speculatively during review, if
+        any platform needs banners.
+        """
+        platforms = self._platforms_needing_banners(strategy)
+
+        def design(creatives: CreativeSet) -> Awaitable[AgentResponse]:
+            return self.designer.execute(
+                self._design_task(project, strategy, creatives, platforms)
+            )
+
+        return await self._create_with_review(
             agent=self.copywriter,
-            task=task,
+            task=self._copywriting_task(project, strategy, hypotheses),
             artifact_type=ArtifactType.COPY,
             project_id=project.id,
             review_criteria=[
@@ -374,38 +585,54 @@ class Orchestrator:
                 "Для Яндекс - соответствие требованиям модерации",
                 "Разнообразие вариантов для A/B тестов",
             ],
+            first_attempt=first_attempt,
+            speculate=design if platforms else None,
         )
 
-        return creatives
+    def _platforms_needing_banners(self, strategy: Strategy) -> list[str]:
+        """Enabled platforms that use image banners."""
+        return [
+            platform.platform.value
+            for platform in strategy.platforms
+            if platform.enabled and platform.platform.value not in _BANNERLESS_PLATFORMS
+        ]
 
-    async def _stage_design(
-        self, project: Project, strategy: Strategy, creatives: CreativeSet
-    ) -> BannerSet:
-        """Stage 5: Create banners for platforms that need them."""
-        # Check which platforms need banners
-        platforms_needing_banners = []
-        for platform in strategy.platforms:
-            if platform.enabled and platform.platform.value not in ["telegram_ads", "telegram_seeding"]:
-                platforms_needing_banners.append(platform.platform.value)
-
-        if not platforms_needing_banners:
-            # No banners needed (e.g., TG Ads only)
-            return BannerSet(banners=[], total_count=0)
-
-        task = AgentTask(
+    def _design_task(
+        self,
+        project: Project,
+        strategy: Strategy,
+        creatives: CreativeSet,
+        platforms_needing_banners: list[str],
+    ) -> AgentTask:
+        """Build the banner design task for a set of creatives."""
+        return AgentTask(
             task_type=TaskType.CREATE,
             description="Create banner images for platforms that need them",
             context={
                 "creatives": creatives,
-                "strategy": strategy.model_dump(),
-                "brief": project.brief.model_dump() if project.brief else {},
+                "strategy": _dump_once(strategy),
+                "brief": _dump_once(project.brief),
                 "platforms_needing_banners": platforms_needing_banners,
             },
         )
 
-        banners = await self._create_with_review(
+    async def _stage_design(
+        self,
+        project: Project,
+        strategy: Strategy,
+        creatives: CreativeSet,
+        first_attempt: Optional[asyncio.Task] = None,
+    ) -> BannerSet:
+        """Stage 5: Create banners for platforms that need them."""
+        platforms_needing_banners = self._platforms_needing_banners(strategy)
+
+        if not platforms_needing_banners:
+            # No banners needed (e.g., TG Ads only)
+            return BannerSet(banners=[], total_count=0)
+
+        banners, _ = await self._create_with_review(
             agent=self.designer,
-            task=task,
+            task=self._design_task(project, strategy, creatives, platforms_needing_banners),
             artifact_type=ArtifactType.BANNERS,
             project_id=project.id,
             review_criteria=[
@@ -413,6 +640,7 @@ class Orchestrator:
                 "Читаемость текста",
                 "Соответствие стилю бренда",
             ],
+            first_attempt=first_attempt,
         )
 
         return banners
@@ -424,86 +652,245 @@ class Orchestrator:
         artifact_type: ArtifactType,
         project_id: str,
         review_criteria: list[str],
-    ) -> Any:
-        """Create artifact with PM review loop."""
-        revisions = 0
-
-        while revisions < self.max_revisions:
-            # Agent creates
-            response = await agent.execute(task)
-            if not response.success:
-                raise Exception(f"Agent {agent.name} failed: {response.error_message}")
+        first_attempt: Optional[asyncio.Task] = None,
+        speculate: Optional[Callable[[Any], Awaitable[AgentResponse]]] = None,
+    ) -> tuple[Any, Optional[asyncio.Task]]:
+        """Create artifact with PM review loop.
+
+        ``first_attempt`` is an already running agent call used in place of the
+        first ``agent.execute``. ``speculate`` starts the next stage's agent
+        call from each draft while the PM reviews it; the task for the accepted
+        draft is returned alongside the output, the others are cancelled.
+        """
+        # Revisions reuse the same brief/strategy context, so serialize it once
+        with format_cache_scope():
+            return await self._review_loop(
+                agent, task, artifact_type, project_id, review_criteria, first_attempt, speculate
+            )
 
-            output = response.output
+    async def _review_loop(
+        self,
+        agent,
+        task: AgentTask,
+        artifact_type: ArtifactType,
+        project_id: str,
+        review_criteria: list[str],
+        first_attempt: Optional[asyncio.Task] = None,
+        speculate: Optional[Callable[[Any], Awaitable[AgentResponse]]] = None,
+    ) -> tuple[Any, Optional[asyncio.Task]]:
+        """Run create → review → revise until approved or out of revisions."""
+        revisions = 0
+        speculative: Optional[asyncio.Task] = None
 
-            # Save artifact (in_progress)
-            artifact = Artifact(
-                id=str(uuid.uuid4()),
-                project_id=project_id,
-                type=artifact_type,
-                status=ArtifactStatus.REVIEW,
-                version=revisions + 1,
-                content=output.model_dump() if hasattr(output, "model_dump") else output,
-                agent_name=agent.name,
-            )
-            save_artifact(artifact)
-
-            # PM reviews
-            review_task = AgentTask(
-                task_type=TaskType.REVIEW,
-                description=f"Review {artifact_type.value}",
-                input_data=output.model_dump() if hasattr(output, "model_dump") else output,
-                context={
-                    "work_type": artifact_type.value,
-                    "criteria": review_criteria,
-                },
+        def report_field(field: str):
+            self._emit_event(
+                "stage_progress",
+                {"type": artifact_type.value, "revision": revisions, "field": field},
             )
 
-            review_response = await self.pm.execute(review_task)
-            if not review_response.success:
-                # If review fails, just accept the work
-                artifact.status = ArtifactStatus.APPROVED
-                return output
-
-            review: ReviewResult = review_response.output
+        try:
+            while revisions < self.max_revisions:
+                review_response: Optional[AgentResponse] = None
+                if revisions == 0 and self.parallel_drafts > 1:
+                    # Several first drafts at once, already reviewed
+                    (
+                        response, content, review_response, speculative
+                    ) = await self._parallel_drafts(
+                        agent,
+                        task,
+                        artifact_type,
+                        review_criteria,
+                        first_attempt,
+                        report_field,
+                        speculate,
+                    )
+                    first_attempt = None
+                # Agent creates (the first draft may already be in flight)
+                elif first_attempt is not None:
+                    response = await first_attempt
+                    first_attempt = None
+                else:
+                    with report_fields_to(report_field):
+                        response = await agent.execute(task)
+                if not response.success:
+                    raise Exception(f"Agent {agent.name} failed: {response.error_message}")
+
+                output = response.output
+                if review_response is None:
+                    # Dumped once for both the stored artifact and the review prompt
+                    content = output.model_dump() if hasattr(output, "model_dump") else output
+
+                # Save artifact (in_progress)
+                now = datetime.now(timezone.utc)
+                artifact = Artifact.model_construct(
+                    id=new_id(),
+                    project_id=project_id,
+                    type=artifact_type,
+                    status=ArtifactStatus.REVIEW,
+                    version=revisions + 1,
+                    content=content,
+                    agent_name=agent.name,
+                    created_at=now,
+                    updated_at=now,
+                )
+                save_artifact(artifact)
+
+                if review_response is None:
+                    # Bet on approval: start the next stage while the PM reviews
+                    if speculate is not None:
+                        speculative = asyncio.create_task(speculate(output))
+
+                    # PM reviews
+                    review_response = await self.pm.execute(
+                        self._review_task(artifact_type, content, review_criteria)
+                    )
+                if not review_response.success:
+                    # If review fails, just accept the work
+                    artifact.status = ArtifactStatus.APPROVED
+                    return output, speculative
+
+                review: ReviewResult = review_response.output
+
+                if review.approved or review.score >= 8:
+                    # Approved!
+                    artifact.status = ArtifactStatus.APPROVED
+                    self._emit_event(
+                        "artifact_approved",
+                        {"type": artifact_type.value, "score": review.score},
+                    )
+                    return output, speculative
+
+                # Need revision
+                revisions += 1
+                artifact.status = ArtifactStatus.REVISION
+                artifact.review_notes = review.feedback
+
+                # The last draft is accepted anyway, so its speculation stays useful
+                if speculative is not None and revisions < self.max_revisions:
+                    speculative.cancel()
+                    speculative = None
 
-            if review.approved or review.score >= 8:
-                # Approved!
-                artifact.status = ArtifactStatus.APPROVED
                 self._emit_event(
-                    "artifact_approved",
-                    {"type": artifact_type.value, "score": review.score},
+                    "artifact_revision",
+                    {
+                        "type": artifact_type.value,
+                        "revision": revisions,
+                        "feedback": review.feedback,
+                    },
                 )
-                return output
 
-            # Need revision
-            revisions += 1
-            artifact.status = ArtifactStatus.REVISION
-            artifact.review_notes = review.feedback
+                # Update task for revision
+                task = AgentTask(
+                    task_type=TaskType.REVISE,
+                    description=f"Revise {artifact_type.value}",
+                    input_data=output,
+                    context={
+                        **task.context,
+                        "feedback": review.revision_instructions or review.feedback,
+                        "output_type": task.context.get("output_type"),
+                    },
+                )
+        except BaseException:
+            if speculative is not None:
+                speculative.cancel()
+            raise
 
-            self._emit_event(
-                "artifact_revision",
-                {
-                    "type": artifact_type.value,
-                    "revision": revisions,
-                    "feedback": review.feedback,
-                },
-            )
+        # Max revisions reached, accept last version
+        return output, speculative
+
+    def _review_task(
+        self, artifact_type: ArtifactType, content: Any, review_criteria: list[str]
+    ) -> AgentTask:
+        """Build the PM review task for a draft."""
+        context = {
+            "work_type": artifact_type.value,
+            "criteria": review_criteria,
+        }
+        if get_settings().llm_fast_reviews:
+            # Opt-in: reviews decide whether a draft advances, so they stay on the main model
+            context["priority"] = "low"
+        return AgentTask(
+            task_type=TaskType.REVIEW,
+            description=f"Review {artifact_type.value}",
+            input_data=content,
+            context=context,
+        )
 
-            # Update task for revision
-            task = AgentTask(
-                task_type=TaskType.REVISE,
-                description=f"Revise {artifact_type.value}",
-                input_data=output,
-                context={
-                    **task.context,
-                    "feedback": review.revision_instructions or review.feedback,
-                    "output_type": task.context.get("output_type"),
-                },
+    async def _parallel_drafts(
+        self,
+        agent,
+        task: AgentTask,
+        artifact_type: ArtifactType,
+        review_criteria: list[str],
+        first_attempt: Optional[asyncio.Task],
+        report_field: Callable[[str], None],
+        speculate: Optional[Callable[[Any], Awaitable[AgentResponse]]] = None,
+    ) -> tuple[AgentResponse, Any, Optional[AgentResponse], Optional[asyncio.Task]]:
+        """Create and review ``parallel_drafts`` drafts concurrently.
+
+        Returns ``(response, content, review_response, speculative)`` for the first
+        draft that is approved (or whose review fails, which the loop also accepts)
+        and cancels the rest; otherwise the highest-scoring draft. Extra drafts are
+        sent as independent requests so they are not merged with the first one,
+        and each draft starts ``speculate`` while its review runs, as in the
+        serial loop; only the returned draft's speculation is kept.
+        """
+        speculations: list[asyncio.Task] = []
+
+        async def draft_and_review(pending: Awaitable[AgentResponse], independent: bool):
+            with report_fields_to(report_field):
+                if independent:
+                    with independent_calls():
+                        response = await pending
+                else:
+                    response = await pending
+            if not response.success:
+                return response, None, None, None
+            output = response.output
+            content = output.model_dump() if hasattr(output, "model_dump") else output
+            speculative = None
+            if speculate is not None:
+                speculative = asyncio.create_task(speculate(output))
+                speculations.append(speculative)
+            review_response = await self.pm.execute(
+                self._review_task(artifact_type, content, review_criteria)
             )
-
-        # Max revisions reached, accept last version
-        return output
+            return response, content, review_response, speculative
+
+        runs = []
+        first = first_attempt if first_attempt is not None else agent.execute(task)
+        runs.append(asyncio.ensure_future(draft_and_review(first, independent=False)))
+        runs += [
+            asyncio.ensure_future(draft_and_review(agent.execute(task), independent=True))
+            for _ in range(self.parallel_drafts - 1)
+        ]
+
+        best = None
+        best_score = -1
+        try:
+            for next_done in asyncio.as_completed(runs):
+                result = await next_done
+                response, _, review_response, _ = result
+                if not response.success:
+                    best = best or result
+                    continue
+                if not review_response.success:
+                    best = result
+                    return result
+                review: ReviewResult = review_response.output
+                if review.approved or review.score >= 8:
+                    best = result
+                    return result
+                if not best or not best[0].success or review.score > best_score:
+                    best, best_score = result, review.score
+            return best
+        finally:
+            for run in runs:
+                run.cancel()
+            kept = best[3] if best is not None else None
+            for speculative in speculations:
+                if speculative is not kept:
+                    speculative.cancel()
 
     # === Methods for regeneration/variation ===
 
@@ -586,7 +973,7 @@ class Orchestrator:
             context={
                 "existing_creatives": copy_artifact.content,
                 "strategy": strategy_artifact.content,
-                "brief": project.brief.model_dump() if project.brief else {},
+                "brief": _dump_once(project.brief),
                 "platform": platform,
                 "count": count,
                 "action": "generate_more",
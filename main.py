@@ -2,7 +2,13 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import get_settings
+# routes must load first: core.orchestrator imports routes.artifacts, whose package pulls in
+# routes.projects, which in turn needs the finished orchestrator module
 from routes import projects, artifacts
+from core.orchestrator import orchestrator
+from services.llm import llm_service
+from services.image_gen import image_gen_service
+from services.parser import parser_service
 
 
 @asynccontextmanager
@@ -10,9 +16,14 @@ async def lifespan(app: FastAPI):
     # Startup
     settings = get_settings()
     print(f"Starting {settings.app_name}...")
+    orchestrator.start_workers(settings.pipeline_workers)
     yield
     # Shutdown
     print("Shutting down...")
+    await orchestrator.stop_workers()
+    await llm_service.aclose()
+    await image_gen_service.aclose()
+    await parser_service.aclose()
 
 
 app = FastAPI(
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ArtifactType(str, Enum):
@@ -35,11 +35,10 @@ class Artifact(BaseModel):
     agent_name: str = Field(..., description="Which agent produced this")
     review_notes: Optional[str] = Field(None, description="PM review notes if revision needed")
     user_feedback: Optional[str] = Field(None, description="User feedback if any")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Question(BaseModel):
@@ -1,7 +1,11 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+from collections import Counter
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field, StringConstraints
 from .strategy import AdPlatform
 
+# CTA button label limit shared by VK and Telegram
+ButtonText = Annotated[str, StringConstraints(max_length=25)]
+
 
 class YandexCreative(BaseModel):
     """Creative for Yandex.Direct (RSY)."""
@@ -23,14 +27,14 @@ class VKCreative(BaseModel):
     text_full: Optional[str] = Field(None, max_length=2000, description="Full text if needed")
     image_url: Optional[str] = None
     image_size: str = Field(default="1080x607", description="Image dimensions")
-    button_text: Optional[str] = Field(None, max_length=25)
+    button_text: Optional[ButtonText] = None
 
 
 class TelegramCreative(BaseModel):
     """Creative for Telegram Ads (official)."""
 
     text: str = Field(..., max_length=160, description="Ad text (max 160 chars)")
-    button_text: str = Field(..., max_length=25, description="CTA button text")
+    button_text: ButtonText = Field(..., description="CTA button text")
     button_url: Optional[str] = None
 
 
@@ -41,7 +45,7 @@ class TelegramSeedingCreative(BaseModel):
     short_text: Optional[str] = Field(None, max_length=300, description="Short version for smaller channels")
     image_prompt: Optional[str] = Field(None, description="Image description if needed")
     has_image: bool = Field(default=False, description="Whether post should have an image")
-    button_text: Optional[str] = Field(None, max_length=25, description="Optional inline button")
+    button_text: Optional[ButtonText] = Field(None, description="Optional inline button")
     button_url: Optional[str] = None
     post_style: str = Field(default="native", description="native/informative/entertaining")
     suggested_channels_type: list[str] = Field(
@@ -69,11 +73,7 @@ class CreativeSet(BaseModel):
     total_by_platform: dict[str, int] = Field(default_factory=dict)
 
     def count_by_platform(self) -> dict[str, int]:
-        counts: dict[str, int] = {}
-        for c in self.creatives:
-            platform = c.platform.value
-            counts[platform] = counts.get(platform, 0) + 1
-        return counts
+        return dict(Counter(c.platform.value for c in self.creatives))
 
 
 class BannerSpec(BaseModel):
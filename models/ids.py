@@ -0,0 +1,44 @@
+import os
+import time
+import uuid
+
+# Sequence within the current millisecond, so IDs from one process stay ordered
+_last_ms = 0
+_sequence = 0
+
+# Random low bits, read from the OS in blocks so each ID doesn't cost a syscall
+_RANDOM_BLOCK = 64
+_random_pool: list[int] = []
+
+
+def _random_bits() -> int:
+    """Next 62 CSPRNG bits from the pool, refilling it from os.urandom when empty."""
+    if not _random_pool:
+        block = os.urandom(8 * _RANDOM_BLOCK)
+        _random_pool.extend(
+            int.from_bytes(block[i:i + 8], "big") >> 2 for i in range(0, len(block), 8)
+        )
+    return _random_pool.pop()
+
+
+def new_id() -> str:
+    """Generate a time-ordered UUIDv7 string.
+
+    IDs sort by creation time (48-bit millisecond timestamp, then a per-millisecond
+    sequence) and keep 62 random bits, so they remain unguessable.
+    """
+    global _last_ms, _sequence
+    ms = time.time_ns() // 1_000_000
+    if ms == _last_ms:
+        _sequence = (_sequence + 1) & 0xFFF
+    else:
+        _last_ms, _sequence = ms, 0
+
+    value = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | _sequence << 64
+        | 0b10 << 62
+        | _random_bits()
+    )
+    return str(uuid.UUID(int=value))
@@ -1,12 +1,22 @@
+from collections import defaultdict
+from datetime import datetime, timezone
 from typing import Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from models.artifact import Artifact, ArtifactType, ArtifactStatus
+from models.ids import new_id
+from .responses import ModelResponse
 
 router = APIRouter()
 
 # In-memory storage for MVP
-artifacts_db: dict[str, list[Artifact]] = {}
+artifacts_db: defaultdict[str, list[Artifact]] = defaultdict(list)
+
+# Latest version per (project, type), maintained by save_artifact
+latest_artifacts: dict[tuple[str, ArtifactType], Artifact] = {}
+
+# Artifact lookup by ID across all projects, maintained by save_artifact
+artifacts_by_id: dict[str, Artifact] = {}
 
 
 class ArtifactResponse(BaseModel):
@@ -22,46 +32,36 @@ class ArtifactEditRequest(BaseModel):
     feedback: Optional[str] = None
 
 
-@router.get("/project/{project_id}")
-async def get_project_artifacts(project_id: str) -> ArtifactListResponse:
+@router.get("/project/{project_id}", response_model=ArtifactListResponse)
+async def get_project_artifacts(project_id: str) -> ModelResponse:
     """Get all artifacts for a project."""
     artifacts = artifacts_db.get(project_id, [])
-    return ArtifactListResponse(artifacts=artifacts)
+    return ModelResponse(ArtifactListResponse.model_construct(artifacts=artifacts))
 
 
-@router.get("/project/{project_id}/{artifact_type}")
-async def get_artifact_by_type(project_id: str, artifact_type: ArtifactType) -> ArtifactResponse:
+@router.get("/project/{project_id}/{artifact_type}", response_model=ArtifactResponse)
+async def get_artifact_by_type(project_id: str, artifact_type: ArtifactType) -> ModelResponse:
     """Get specific artifact type for a project."""
-    artifacts = artifacts_db.get(project_id, [])
-
-    # Find latest version of this type
-    matching = [a for a in artifacts if a.type == artifact_type]
-    if not matching:
+    latest = get_latest_artifact(project_id, artifact_type)
+    if latest is None:
         raise HTTPException(status_code=404, detail="Artifact not found")
 
-    latest = max(matching, key=lambda a: a.version)
-    return ArtifactResponse(artifact=latest)
+    return ModelResponse(ArtifactResponse.model_construct(artifact=latest))
 
 
-@router.post("/project/{project_id}/{artifact_type}/edit")
+@router.post("/project/{project_id}/{artifact_type}/edit", response_model=ArtifactResponse)
 async def edit_artifact(
     project_id: str, artifact_type: ArtifactType, data: ArtifactEditRequest
-) -> ArtifactResponse:
+) -> ModelResponse:
     """User edits an artifact."""
-    artifacts = artifacts_db.get(project_id, [])
-
-    matching = [a for a in artifacts if a.type == artifact_type]
-    if not matching:
+    latest = get_latest_artifact(project_id, artifact_type)
+    if latest is None:
         raise HTTPException(status_code=404, detail="Artifact not found")
 
-    latest = max(matching, key=lambda a: a.version)
-
     # Create new version with user edits
-    import uuid
-    from datetime import datetime
-
-    new_artifact = Artifact(
-        id=str(uuid.uuid4()),
+    now = datetime.now(timezone.utc)
+    new_artifact = Artifact.model_construct(
+        id=new_id(),
         project_id=project_id,
         type=artifact_type,
         status=ArtifactStatus.USER_EDITED,
@@ -69,38 +69,41 @@ async def edit_artifact(
         content=data.content,
         agent_name="user",
         user_feedback=data.feedback,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        created_at=now,
+        updated_at=now,
     )
 
-    artifacts_db[project_id].append(new_artifact)
+    save_artifact(new_artifact)
 
-    return ArtifactResponse(artifact=new_artifact)
+    return ModelResponse(ArtifactResponse.model_construct(artifact=new_artifact))
 
 
-@router.get("/{artifact_id}")
-async def get_artifact(artifact_id: str) -> ArtifactResponse:
+@router.get("/{artifact_id}", response_model=ArtifactResponse)
+async def get_artifact(artifact_id: str) -> ModelResponse:
     """Get specific artifact by ID."""
-    for artifacts in artifacts_db.values():
-        for artifact in artifacts:
-            if artifact.id == artifact_id:
-                return ArtifactResponse(artifact=artifact)
+    artifact = artifacts_by_id.get(artifact_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
 
-    raise HTTPException(status_code=404, detail="Artifact not found")
+    return ModelResponse(ArtifactResponse.model_construct(artifact=artifact))
 
 
 # Helper function for other modules
 def save_artifact(artifact: Artifact):
-    """Save an artifact to storage."""
-    if artifact.project_id not in artifacts_db:
-        artifacts_db[artifact.project_id] = []
-    artifacts_db[artifact.project_id].append(artifact)
+    """Save an artifact to storage.
+
+    Re-saving the current latest artifact after bumping its version in place
+    only refreshes the index; it is not stored a second time.
+    """
+    key = (artifact.project_id, artifact.type)
+    latest = latest_artifacts.get(key)
+    if latest is not artifact:
+        artifacts_db[artifact.project_id].append(artifact)
+        artifacts_by_id[artifact.id] = artifact
+    if latest is None or artifact.version > latest.version:
+        latest_artifacts[key] = artifact
 
 
 def get_latest_artifact(project_id: str, artifact_type: ArtifactType) -> Optional[Artifact]:
     """Get latest version of an artifact type."""
-    artifacts = artifacts_db.get(project_id, [])
-    matching = [a for a in artifacts if a.type == artifact_type]
-    if not matching:
-        return None
-    return max(matching, key=lambda a: a.version)
+    return latest_artifacts.get((project_id, artifact_type))
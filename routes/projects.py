@@ -1,17 +1,34 @@
+import asyncio
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import orjson
+from models.creative import CreativeSet
 from models.project import Project, ProjectCreate, ProjectStatus
 from core.orchestrator import orchestrator
+from .responses import ModelResponse
 
 router = APIRouter()
 
 # In-memory storage for MVP (replace with DB)
 projects_db: dict[str, Project] = {}
 
+# Each user's projects in creation order, maintained by create_project
+projects_by_user: dict[str, list[Project]] = {}
+
+VARIATION_TYPES = frozenset({"tone", "angle", "length", "cta"})
+
+# Platforms generate-more accepts, in the order the error message lists them
+_GENERATE_PLATFORMS = (
+    "yandex_direct", "vk_ads", "telegram_ads", "telegram_seeding",
+    "yandex_business", "vk_market"
+)
+GENERATE_PLATFORMS = frozenset(_GENERATE_PLATFORMS)
+_INVALID_PLATFORM = f"Invalid platform. Must be one of: {', '.join(_GENERATE_PLATFORMS)}"
+
 
 class ProjectResponse(BaseModel):
     project: Project
@@ -22,6 +39,19 @@ class ProjectListResponse(BaseModel):
     total: int
 
 
+class CreativeChangeResponse(BaseModel):
+    message: str
+    creative_id: str
+    creatives: CreativeSet
+
+
+class GenerateMoreResponse(BaseModel):
+    message: str
+    platform: str
+    count: int
+    creatives: CreativeSet
+
+
 class ChatMessage(BaseModel):
     message: str
     stage: Optional[str] = None
@@ -55,39 +85,45 @@ class GenerateMoreRequest(BaseModel):
 
 
 @router.post("", response_model=ProjectResponse)
-async def create_project(data: ProjectCreate, background_tasks: BackgroundTasks):
+async def create_project(data: ProjectCreate) -> ModelResponse:
     """Create a new project and start analysis."""
     project_id = str(uuid.uuid4())
-    project = Project(
+    now = datetime.now(timezone.utc)
+    project = Project.model_construct(
         id=project_id,
         user_id="user_1",  # TODO: get from auth
         name=data.name or f"Project {project_id[:8]}",
         url=str(data.url),
         status=ProjectStatus.CREATED,
+        created_at=now,
+        updated_at=now,
     )
     projects_db[project_id] = project
+    projects_by_user.setdefault(project.user_id, []).append(project)
 
-    # Start pipeline in background
-    background_tasks.add_task(orchestrator.run_pipeline, project)
+    # Start pipeline on a worker
+    orchestrator.enqueue(orchestrator.run_pipeline, project)
 
-    return ProjectResponse(project=project)
+    return ModelResponse(ProjectResponse.model_construct(project=project))
 
 
 @router.get("", response_model=ProjectListResponse)
-async def list_projects(user_id: str = "user_1"):
+async def list_projects(user_id: str = "user_1") -> ModelResponse:
     """List all projects for a user."""
-    user_projects = [p for p in projects_db.values() if p.user_id == user_id]
-    user_projects.sort(key=lambda p: p.created_at, reverse=True)
-    return ProjectListResponse(projects=user_projects, total=len(user_projects))
+    # Appended as created, so newest first is just the reverse
+    user_projects = projects_by_user.get(user_id, [])[::-1]
+    return ModelResponse(
+        ProjectListResponse.model_construct(projects=user_projects, total=len(user_projects))
+    )
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
-async def get_project(project_id: str):
+async def get_project(project_id: str) -> ModelResponse:
     """Get a project by ID."""
     project = projects_db.get(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return ProjectResponse(project=project)
+    return ModelResponse(ProjectResponse.model_construct(project=project))
 
 
 @router.get("/{project_id}/status")
@@ -105,31 +141,53 @@ async def get_project_status(project_id: str):
     }
 
 
+# Idle SSE streams send a comment frame this often so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
+_SSE_KEEPALIVE = b": keepalive\n\n"
+
+
+def _sse_data(payload: dict) -> bytes:
+    """Encode a payload as one SSE data frame."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
 @router.get("/{project_id}/stream")
 async def stream_project_updates(project_id: str):
     """SSE stream for real-time pipeline updates."""
 
     async def event_generator():
-        import asyncio
+        project = projects_db.get(project_id)
+        if not project:
+            yield _sse_data({"error": "Project not found"})
+            return
 
+        last = None
         while True:
-            project = projects_db.get(project_id)
-            if not project:
-                yield f"data: {{'error': 'Project not found'}}\n\n"
-                break
-
-            yield f"data: {{'status': '{project.status}', 'stage': {project.current_stage}}}\n\n"
+            # Taken before the state is read, so a change made while the frame
+            # is being written still wakes the wait below
+            changed = orchestrator.project_changed(project_id)
+            state = (project.status, project.current_stage)
+            # A notification may leave status and stage as they were; send only changes
+            if state != last:
+                last = state
+                yield _sse_data({"status": project.status, "stage": project.current_stage})
 
             if project.status in [ProjectStatus.COMPLETED, ProjectStatus.FAILED]:
                 break
 
-            await asyncio.sleep(1)
+            # Sleep until the orchestrator reports a change; ping idle proxies meanwhile
+            while True:
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=SSE_KEEPALIVE_SECONDS)
+                    break
+                except asyncio.TimeoutError:
+                    yield _SSE_KEEPALIVE
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
 @router.post("/{project_id}/start")
-async def start_pipeline(project_id: str, background_tasks: BackgroundTasks):
+async def start_pipeline(project_id: str):
     """Start or restart the pipeline for a project."""
     project = projects_db.get(project_id)
     if not project:
@@ -139,9 +197,10 @@ async def start_pipeline(project_id: str, background_tasks: BackgroundTasks):
         raise HTTPException(status_code=400, detail="Pipeline already running or completed")
 
     project.status = ProjectStatus.ANALYZING
-    project.updated_at = datetime.utcnow()
+    project.updated_at = datetime.now(timezone.utc)
+    orchestrator.notify_project(project_id)
 
-    background_tasks.add_task(orchestrator.run_pipeline, project)
+    orchestrator.enqueue(orchestrator.run_pipeline, project)
 
     return {"message": "Pipeline started", "project_id": project_id}
 
@@ -163,7 +222,7 @@ async def send_chat_message(project_id: str, data: ChatMessage):
 
 
 @router.post("/{project_id}/answers")
-async def submit_answers(project_id: str, data: AnswersSubmit, background_tasks: BackgroundTasks):
+async def submit_answers(project_id: str, data: AnswersSubmit):
     """Submit answers to interview questions and continue pipeline."""
     project = projects_db.get(project_id)
     if not project:
@@ -175,8 +234,8 @@ async def submit_answers(project_id: str, data: AnswersSubmit, background_tasks:
             detail=f"Project is not waiting for answers (current status: {project.status})"
         )
 
-    # Continue pipeline with answers in background
-    background_tasks.add_task(orchestrator.continue_after_answers, project, data.answers)
+    # Continue pipeline with answers on a worker
+    orchestrator.enqueue(orchestrator.continue_after_answers, project, data.answers)
 
     return {
         "message": "Answers received, continuing pipeline",
@@ -185,8 +244,8 @@ async def submit_answers(project_id: str, data: AnswersSubmit, background_tasks:
     }
 
 
-@router.post("/{project_id}/creatives/regenerate")
-async def regenerate_creative(project_id: str, data: RegenerateRequest):
+@router.post("/{project_id}/creatives/regenerate", response_model=CreativeChangeResponse)
+async def regenerate_creative(project_id: str, data: RegenerateRequest) -> ModelResponse:
     """Regenerate a specific creative with optional feedback."""
     project = projects_db.get(project_id)
     if not project:
@@ -202,17 +261,17 @@ async def regenerate_creative(project_id: str, data: RegenerateRequest):
         result = await orchestrator.regenerate_creative(
             project, data.creative_id, data.feedback or ""
         )
-        return {
-            "message": "Creative regenerated",
-            "creative_id": data.creative_id,
-            "creatives": result.model_dump(),
-        }
+        return ModelResponse(CreativeChangeResponse.model_construct(
+            message="Creative regenerated",
+            creative_id=data.creative_id,
+            creatives=result,
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/{project_id}/creatives/variation")
-async def create_creative_variation(project_id: str, data: VariationRequest):
+@router.post("/{project_id}/creatives/variation", response_model=CreativeChangeResponse)
+async def create_creative_variation(project_id: str, data: VariationRequest) -> ModelResponse:
     """Create a variation of a specific creative."""
     project = projects_db.get(project_id)
     if not project:
@@ -224,7 +283,7 @@ async def create_creative_variation(project_id: str, data: VariationRequest):
             detail="Cannot create variations until pipeline is complete"
         )
 
-    if data.variation_type not in ["tone", "angle", "length", "cta"]:
+    if data.variation_type not in VARIATION_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Invalid variation type. Must be one of: tone, angle, length, cta"
@@ -234,17 +293,17 @@ async def create_creative_variation(project_id: str, data: VariationRequest):
         result = await orchestrator.create_variation(
             project, data.creative_id, data.variation_type
         )
-        return {
-            "message": f"Variation ({data.variation_type}) created",
-            "creative_id": data.creative_id,
-            "creatives": result.model_dump(),
-        }
+        return ModelResponse(CreativeChangeResponse.model_construct(
+            message=f"Variation ({data.variation_type}) created",
+            creative_id=data.creative_id,
+            creatives=result,
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/{project_id}/creatives/generate-more")
-async def generate_more_creatives(project_id: str, data: GenerateMoreRequest):
+@router.post("/{project_id}/creatives/generate-more", response_model=GenerateMoreResponse)
+async def generate_more_creatives(project_id: str, data: GenerateMoreRequest) -> ModelResponse:
     """Generate more creatives for a specific platform."""
     project = projects_db.get(project_id)
     if not project:
@@ -256,15 +315,8 @@ async def generate_more_creatives(project_id: str, data: GenerateMoreRequest):
             detail="Cannot generate more creatives until pipeline is complete"
         )
 
-    valid_platforms = [
-        "yandex_direct", "vk_ads", "telegram_ads", "telegram_seeding",
-        "yandex_business", "vk_market"
-    ]
-    if data.platform not in valid_platforms:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid platform. Must be one of: {', '.join(valid_platforms)}"
-        )
+    if data.platform not in GENERATE_PLATFORMS:
+        raise HTTPException(status_code=400, detail=_INVALID_PLATFORM)
 
     if not 1 <= data.count <= 10:
         raise HTTPException(
@@ -274,18 +326,18 @@ async def generate_more_creatives(project_id: str, data: GenerateMoreRequest):
 
     try:
         result = await orchestrator.generate_more(project, data.platform, data.count)
-        return {
-            "message": f"Generated {data.count} more creatives for {data.platform}",
-            "platform": data.platform,
-            "count": data.count,
-            "creatives": result.model_dump(),
-        }
+        return ModelResponse(GenerateMoreResponse.model_construct(
+            message=f"Generated {data.count} more creatives for {data.platform}",
+            platform=data.platform,
+            count=data.count,
+            creatives=result,
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Legacy endpoint for backward compatibility
 @router.post("/{project_id}/answer")
-async def submit_answers_legacy(project_id: str, answers: dict, background_tasks: BackgroundTasks):
+async def submit_answers_legacy(project_id: str, answers: dict):
     """Submit answers to PM questions (legacy endpoint)."""
-    return await submit_answers(project_id, AnswersSubmit(answers=answers), background_tasks)
+    return await submit_answers(project_id, AnswersSubmit(answers=answers))
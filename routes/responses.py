@@ -0,0 +1,15 @@
+from fastapi import Response
+from pydantic import BaseModel
+
+
+class ModelResponse(Response):
+    """JSON response rendered straight from a Pydantic model.
+
+    Returning a Response skips FastAPI's jsonable_encoder pass and response
+    model re-validation; routes keep ``response_model`` for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode()
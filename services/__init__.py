@@ -1,10 +1,13 @@
 from .llm import LLMService, llm_service
+from .llm_cache import LLMCache, llm_cache
 from .parser import ParserService, parser_service
 from .image_gen import ImageGenService, image_gen_service
 
 __all__ = [
     "LLMService",
     "llm_service",
+    "LLMCache",
+    "llm_cache",
     "ParserService",
     "parser_service",
     "ImageGenService",
@@ -1,6 +1,9 @@
+import asyncio
+from functools import lru_cache
 from typing import Optional
 from pydantic import BaseModel
 import httpx
+import orjson
 from config import get_settings
 
 
@@ -24,16 +27,68 @@ class BannerResponse(BaseModel):
     prompt_used: str
 
 
+# Fixed style guidance appended to every banner prompt
+_PROMPT_STYLE_SUFFIX = (
+    ". Style: clean, modern, minimalist"
+    ". High contrast, readable text"
+    ". Professional corporate design"
+    ". No watermarks, no stock photo marks"
+)
+
+# Recommended banner sizes per platform
+_PLATFORM_SIZES: dict[str, tuple[tuple[int, int], ...]] = {
+    "yandex_direct": (
+        (1080, 607),  # 16:9
+        (450, 450),  # 1:1
+        (300, 250),  # Medium rectangle
+        (728, 90),  # Leaderboard
+        (160, 600),  # Wide skyscraper
+    ),
+    "vk_ads": (
+        (1080, 607),  # 16:9
+        (1080, 1080),  # 1:1
+        (600, 600),  # Carousel card
+    ),
+    "telegram_ads": (),  # No images in TG Ads
+}
+_DEFAULT_SIZES = ((1080, 607),)
+
+
+@lru_cache(maxsize=64)
+def _placeholder_url(width: int, height: int) -> str:
+    """Placeholder image URL used by mock generation, built once per size."""
+    return f"https://placehold.co/{width}x{height}/1a1a2e/eee?text=Banner+{width}x{height}"
+
+
 class ImageGenService:
     """Service for generating banners via kie.ai (nano-banana) API."""
 
     def __init__(self):
         self.settings = get_settings()
+        # Use mock mode if API key is not configured
+        self.mock_mode = not self.settings.nano_banana_api_key
+        # Bound concurrent requests to stay under provider rate limits
+        self._semaphore = asyncio.Semaphore(self.settings.image_gen_concurrency)
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.settings.nano_banana_api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=httpx.Timeout(120.0, connect=5.0),
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            )
+        return self.client
 
-    @property
-    def mock_mode(self) -> bool:
-        """Use mock mode if API key is not configured."""
-        return not self.settings.nano_banana_api_key
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
 
     async def generate_banner(self, request: BannerRequest) -> BannerResponse:
         """Generate a banner image."""
@@ -44,13 +99,8 @@ class ImageGenService:
 
     async def _mock_generate(self, request: BannerRequest) -> BannerResponse:
         """Mock banner generation - returns placeholder image."""
-        placeholder_url = (
-            f"https://placehold.co/{request.width}x{request.height}/1a1a2e/eee"
-            f"?text=Banner+{request.width}x{request.height}"
-        )
-
         return BannerResponse(
-            image_url=placeholder_url,
+            image_url=_placeholder_url(request.width, request.height),
             width=request.width,
             height=request.height,
             prompt_used=request.prompt,
@@ -61,21 +111,17 @@ class ImageGenService:
         # Build detailed prompt for advertising banner
         full_prompt = self._build_prompt(request)
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with self._semaphore:
             # kie.ai API endpoint
-            response = await client.post(
+            response = await self._get_client().post(
                 f"{self.settings.nano_banana_api_url}/generate",
-                headers={
-                    "Authorization": f"Bearer {self.settings.nano_banana_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
+                content=orjson.dumps({
                     "prompt": full_prompt,
                     "width": request.width,
                     "height": request.height,
                     "style": "professional advertising banner",
                     "negative_prompt": "blurry, low quality, distorted text, watermark, logo",
-                },
+                }),
             )
 
             if response.status_code != 200:
@@ -83,7 +129,7 @@ class ImageGenService:
                 print(f"Image gen API error: {response.status_code} - {response.text}")
                 return await self._mock_generate(request)
 
-            data = response.json()
+            data = orjson.loads(response.content)
 
             return BannerResponse(
                 image_url=data.get("image_url", data.get("url", "")),
@@ -94,53 +140,34 @@ class ImageGenService:
 
     def _build_prompt(self, request: BannerRequest) -> str:
         """Build detailed prompt for banner generation."""
-        parts = [
-            "Professional advertising banner design",
-            f"Size: {request.width}x{request.height} pixels",
-            f"Content: {request.prompt}",
-        ]
+        prompt = (
+            "Professional advertising banner design. "
+            f"Size: {request.width}x{request.height} pixels. "
+            f"Content: {request.prompt}"
+        )
 
         if request.text_overlay:
-            parts.append(f"Main text overlay: '{request.text_overlay}'")
+            prompt += f". Main text overlay: '{request.text_overlay}'"
 
         if request.brand_colors:
-            parts.append(f"Brand colors: {', '.join(request.brand_colors)}")
+            prompt += f". Brand colors: {', '.join(request.brand_colors)}"
 
-        parts.extend([
-            "Style: clean, modern, minimalist",
-            "High contrast, readable text",
-            "Professional corporate design",
-            "No watermarks, no stock photo marks",
-        ])
-
-        return ". ".join(parts)
+        return prompt + _PROMPT_STYLE_SUFFIX
 
     async def generate_batch(self, requests: list[BannerRequest]) -> list[BannerResponse]:
-        """Generate multiple banners."""
-        results = []
-        for req in requests:
-            result = await self.generate_banner(req)
-            results.append(result)
-        return results
-
-    def get_sizes_for_platform(self, platform: str) -> list[tuple[int, int]]:
+        """Generate multiple banners over the shared connection pool.
+
+        kie.ai has no batch endpoint, so requests are sent concurrently (bounded by
+        the service semaphore) and returned in input order.
+        """
+        if self.mock_mode:
+            return [await self._mock_generate(req) for req in requests]
+
+        return list(await asyncio.gather(*(self._real_generate(req) for req in requests)))
+
+    def get_sizes_for_platform(self, platform: str) -> tuple[tuple[int, int], ...]:
         """Get recommended banner sizes for a platform."""
-        sizes = {
-            "yandex_direct": [
-                (1080, 607),  # 16:9
-                (450, 450),  # 1:1
-                (300, 250),  # Medium rectangle
-                (728, 90),  # Leaderboard
-                (160, 600),  # Wide skyscraper
-            ],
-            "vk_ads": [
-                (1080, 607),  # 16:9
-                (1080, 1080),  # 1:1
-                (600, 600),  # Carousel card
-            ],
-            "telegram_ads": [],  # No images in TG Ads
-        }
-        return sizes.get(platform, [(1080, 607)])
+        return _PLATFORM_SIZES.get(platform, _DEFAULT_SIZES)
 
 
 # Global instance
@@ -1,12 +1,83 @@
-import json
-from typing import Any, Optional, Type, TypeVar
-from pydantic import BaseModel
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Optional, Type, TypeVar
+from pydantic import BaseModel, ValidationError
 import httpx
+import orjson
 from config import get_settings
 
 T = TypeVar("T", bound=BaseModel)
 
 
+@lru_cache(maxsize=None)
+def schema_json(output_schema: Type[BaseModel]) -> str:
+    """JSON schema text for a structured output model, generated once per model.
+
+    Compact, since it is sent as prompt tokens on every structured call.
+    """
+    schema = output_schema.model_json_schema()
+    return orjson.dumps(schema).decode("utf-8")
+
+
+def warm_schemas(*schemas: Type[BaseModel]) -> None:
+    """Generate schema text ahead of time so the first request doesn't pay for it."""
+    for output_schema in schemas:
+        schema_json(output_schema)
+
+
+class _FieldScanner:
+    """Incrementally scan streamed JSON text for completed top-level fields.
+
+    Text before the first object (e.g. a markdown fence) is ignored; a field is
+    reported once the comma or brace closing its value arrives.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.expect_key = False
+        self.key_chars: Optional[list[str]] = None
+        self.key: Optional[str] = None
+
+    def feed(self, text: str) -> list[str]:
+        """Consume a chunk of text, returning fields completed within it."""
+        completed = []
+        for ch in text:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.key_chars is not None:
+                        self.key = "".join(self.key_chars)
+                        self.key_chars = None
+                    continue
+                if self.key_chars is not None:
+                    self.key_chars.append(ch)
+            elif ch == '"':
+                self.in_string = True
+                if self.depth == 1 and self.expect_key:
+                    self.key_chars = []
+                    self.expect_key = False
+            elif ch in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    self.expect_key = ch == "{"
+            elif ch in "}]":
+                if self.depth == 1 and self.key is not None:
+                    completed.append(self.key)
+                    self.key = None
+                self.depth = max(self.depth - 1, 0)
+            elif ch == "," and self.depth == 1:
+                if self.key is not None:
+                    completed.append(self.key)
+                    self.key = None
+                self.expect_key = True
+        return completed
+
+
 class LLMService:
     """Wrapper around OpenRouter API for agent interactions."""
 
@@ -24,10 +95,28 @@ class LLMService:
                     "X-Title": "AdFlow AI",
                     "Content-Type": "application/json",
                 },
-                timeout=120.0,
+                timeout=httpx.Timeout(120.0, connect=5.0),
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
             )
         return self.client
 
+    async def warmup(self):
+        """Open a pooled connection ahead of the first completion.
+
+        Any response will do: the point is the TCP/TLS handshake, so errors are ignored.
+        """
+        try:
+            await self._get_client().head("/models", timeout=10.0)
+        except httpx.HTTPError:
+            pass
+
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
     async def complete(
         self,
         system_prompt: str,
@@ -35,28 +124,90 @@ class LLMService:
         model: Optional[str] = None,
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        cached_prefix: Optional[str] = None,
     ) -> str:
-        """Simple completion without structured output."""
+        """Simple completion without structured output.
+
+        ``cached_prefix`` is sent as the first block of the user message with an
+        ephemeral ``cache_control`` marker so the provider can reuse it across calls.
+        """
         client = self._get_client()
         model = model or self.settings.llm_model_main
 
         response = await client.post(
             "/chat/completions",
-            json={
+            content=orjson.dumps({
                 "model": model,
                 "max_tokens": max_tokens,
                 "temperature": temperature,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message},
-                ],
-            },
+                "messages": self._build_messages(system_prompt, user_message, cached_prefix),
+            }),
         )
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         return data["choices"][0]["message"]["content"]
 
+    async def stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        model: Optional[str] = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        cached_prefix: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Streaming completion, yielding text deltas as they arrive."""
+        client = self._get_client()
+        model = model or self.settings.llm_model_main
+
+        async with client.stream(
+            "POST",
+            "/chat/completions",
+            content=orjson.dumps({
+                "model": model,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "stream": True,
+                "messages": self._build_messages(system_prompt, user_message, cached_prefix),
+            }),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                # Skip blank keep-alives and SSE comments
+                if not line.startswith("data: "):
+                    continue
+                payload = line[len("data: "):]
+                if payload == "[DONE]":
+                    break
+                chunk = orjson.loads(payload)
+                choices = chunk.get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+    def _build_messages(
+        self, system_prompt: str, user_message: str, cached_prefix: Optional[str] = None
+    ) -> list[dict[str, Any]]:
+        """Build system + user messages, marking static parts for prompt caching.
+
+        The system prompt is always a cache breakpoint; ``cached_prefix`` adds a
+        second one at the start of the user turn.
+        """
+        system_content = [
+            {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}},
+        ]
+        user_content: str | list[dict[str, Any]] = user_message
+        if cached_prefix:
+            user_content = [
+                {"type": "text", "text": cached_prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": user_message},
+            ]
+        return [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": user_content},
+        ]
+
     async def complete_structured(
         self,
         system_prompt: str,
@@ -65,34 +216,85 @@ class LLMService:
         model: Optional[str] = None,
         max_tokens: int = 4096,
         temperature: float = 0.5,
+        cached_prefix: Optional[str] = None,
+        prepare: Optional[Callable[[Any], Any]] = None,
+        on_field: Optional[Callable[[str], None]] = None,
     ) -> T:
-        """Completion with structured JSON output parsed into Pydantic model."""
+        """Completion with structured JSON output parsed into Pydantic model.
+
+        ``prepare`` may normalize the decoded JSON before it is validated. When
+        ``on_field`` is given the response is streamed and the callback receives
+        each top-level field name as soon as its value is complete.
+        """
         model = model or self.settings.llm_model_main
 
         # Add JSON schema instruction to system prompt
-        schema_json = json.dumps(output_schema.model_json_schema(), indent=2, ensure_ascii=False)
+        schema_text = schema_json(output_schema)
         full_system = f"""{system_prompt}
 
 ВАЖНО: Твой ответ должен быть валидным JSON, соответствующим следующей схеме:
 ```json
-{schema_json}
+{schema_text}
 ```
 
 Отвечай ТОЛЬКО валидным JSON без дополнительного текста."""
 
-        response_text = await self.complete(
-            system_prompt=full_system,
-            user_message=user_message,
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-        )
+        if on_field is None:
+            response_text = await self.complete(
+                system_prompt=full_system,
+                user_message=user_message,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                cached_prefix=cached_prefix,
+            )
+        else:
+            scanner = _FieldScanner()
+            parts = []
+            async for delta in self.stream(
+                system_prompt=full_system,
+                user_message=user_message,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                cached_prefix=cached_prefix,
+            ):
+                parts.append(delta)
+                for field in scanner.feed(delta):
+                    on_field(field)
+            response_text = "".join(parts)
 
-        # Try to extract JSON from response
+        try:
+            return self._parse_structured(response_text, output_schema, prepare)
+        except (ValueError, ValidationError) as e:
+            # Ask for a fix of the broken output only, instead of resending the prompt
+            repaired_text = await self.complete(
+                system_prompt=f"""Исправь JSON так, чтобы он соответствовал следующей схеме:
+```json
+{schema_text}
+```
+
+Отвечай ТОЛЬКО валидным JSON без дополнительного текста.""",
+                user_message=f"ОШИБКА:\n{e}\n\nJSON:\n{response_text}",
+                model=model,
+                max_tokens=max_tokens,
+                temperature=0.0,
+            )
+            return self._parse_structured(repaired_text, output_schema, prepare)
+
+    def _parse_structured(
+        self,
+        response_text: str,
+        output_schema: Type[T],
+        prepare: Optional[Callable[[Any], Any]] = None,
+    ) -> T:
+        """Extract JSON from response text and validate it against the schema."""
         json_text = self._extract_json(response_text)
-        data = json.loads(json_text)
+        if prepare is None:
+            # Validate straight from JSON, skipping the intermediate dict tree
+            return output_schema.model_validate_json(json_text)
 
-        return output_schema.model_validate(data)
+        return output_schema.model_validate(prepare(orjson.loads(json_text)))
 
     async def chat(
         self,
@@ -110,15 +312,15 @@ class LLMService:
 
         response = await client.post(
             "/chat/completions",
-            json={
+            content=orjson.dumps({
                 "model": model,
                 "max_tokens": max_tokens,
                 "temperature": temperature,
                 "messages": all_messages,
-            },
+            }),
         )
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         return data["choices"][0]["message"]["content"]
 
@@ -126,22 +328,20 @@ class LLMService:
         """Extract JSON from response that might have markdown code blocks."""
         text = text.strip()
 
-        # Try to find JSON in code blocks
-        if "```json" in text:
-            start = text.find("```json") + 7
-            end = text.find("```", start)
-            if end > start:
-                return text[start:end].strip()
+        # Bare JSON object/array needs no scanning
+        if text.startswith(("{", "[")):
+            return text
 
-        if "```" in text:
-            start = text.find("```") + 3
+        # JSON in the first code block, with or without a json language tag
+        start = text.find("```")
+        if start >= 0:
+            start += 3
             end = text.find("```", start)
             if end > start:
-                return text[start:end].strip()
-
-        # Try to find JSON object/array directly
-        if text.startswith("{") or text.startswith("["):
-            return text
+                block = text[start:end]
+                if block.startswith("json"):
+                    block = block[4:]
+                return block.strip()
 
         # Last resort: find first { and last }
         start = text.find("{")
@@ -0,0 +1,49 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Optional
+
+import orjson
+
+
+class LLMCache:
+    """In-memory TTL cache for LLM responses, keyed by a hash of the request."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._store: dict[str, tuple[float, str]] = {}
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def cache_key(**parts: Any) -> str:
+        """Build a stable SHA-256 key from request parameters."""
+        payload = orjson.dumps(parts, default=str, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return cached value, or None if missing or expired."""
+        async with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._store[key]
+                return None
+            return value
+
+    async def set(self, key: str, value: str, ttl: float = 3600) -> None:
+        """Store value for ttl seconds, evicting the oldest entry when full."""
+        async with self._lock:
+            self._store.pop(key, None)
+            if len(self._store) >= self.max_entries:
+                del self._store[next(iter(self._store))]
+            self._store[key] = (time.monotonic() + ttl, value)
+
+    async def clear(self) -> None:
+        async with self._lock:
+            self._store.clear()
+
+
+# Global instance
+llm_cache = LLMCache()
@@ -1,8 +1,13 @@
+import asyncio
+import html as html_lib
 import re
+import threading
+import time
 from typing import Optional
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlencode, urlparse, urlsplit, urlunsplit
 import httpx
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 from pydantic import BaseModel
 
 
@@ -34,14 +39,267 @@ class ParsedTelegram(BaseModel):
     recent_posts: list[str] = []
 
 
+def _has_class(name: str) -> str:
+    """XPath predicate matching elements that carry a CSS class."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Every element parse_website reads, collected in a single descendant walk
+_PAGE_NODES = etree.XPath(
+    "//*[self::title or self::meta[@name='description'] or self::h1 or self::body"
+    " or self::img[@src] or self::a[@href] or self::main or self::article"
+    f" or @role='main' or {_has_class('content')} or @id='content']"
+)
+# Common content containers, tried in order; keys as bucketed by _page_nodes
+_MAIN_CONTENT = ("main", "article", "role=main", "class=content", "id=content")
+# First text node mentioning an address, compared case-insensitively
+_ADDRESS_TEXT = etree.XPath(
+    "(//text()[contains(translate(., 'АДРЕС', 'адрес'), 'адрес')"
+    " or contains(translate(., 'ADRES', 'adres'), 'address')])[1]"
+)
+
+# Telegram DOM fallback selectors, compiled once; each returns matching nodes in document order
+_TG_NAME = etree.XPath(f"(//*[{_has_class('tgme_channel_info_header_title')}])[1]")
+_TG_USERNAME = etree.XPath(f"(//*[{_has_class('tgme_channel_info_header_username')}])[1]")
+_TG_DESCRIPTION = etree.XPath(f"(//*[{_has_class('tgme_channel_info_description')}])[1]")
+_TG_SUBSCRIBERS = etree.XPath(
+    f"(//*[{_has_class('tgme_channel_info_counter')}]//*[{_has_class('counter_value')}])[1]"
+)
+_TG_AVATAR = etree.XPath(f"(//*[{_has_class('tgme_channel_info_header')}]//img)[1]")
+_TG_POSTS = etree.XPath(f"//*[{_has_class('tgme_widget_message_text')}]")
+
+
+def _tg_block_re(name: str) -> re.Pattern:
+    """Regex capturing the inner HTML of a div carrying a Telegram class."""
+    return re.compile(
+        rf'<div class="(?:[^"]*\s)?{name}(?:\s[^"]*)?"[^>]*>(.*?)</div>', re.S
+    )
+
+
+# The t.me/s/ preview markup is stable enough to scrape without building a DOM
+_TG_NAME_RE = _tg_block_re("tgme_channel_info_header_title")
+_TG_USERNAME_RE = _tg_block_re("tgme_channel_info_header_username")
+_TG_DESCRIPTION_RE = _tg_block_re("tgme_channel_info_description")
+_TG_SUBSCRIBERS_RE = re.compile(
+    r'class="tgme_channel_info_counter"[^>]*>\s*<span class="counter_value"[^>]*>([^<]*)<'
+)
+_TG_AVATAR_RE = re.compile(r'class="tgme_page_photo_image[^"]*"[^>]*>\s*<img src="([^"]+)"')
+_TG_POST_RE = _tg_block_re("tgme_widget_message_text")
+_TAG_RE = re.compile(r"<[^>]*>")
+_DIV_TAG_RE = re.compile(r"<(/?)div\b", re.I)
+
+_EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+# Russian format
+_PHONE_RE = re.compile(r"(?:\+7|8)[\s\-]?\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{2}[\s\-]?\d{2}")
+_CYRILLIC_RE = re.compile(r"[а-яА-ЯёЁ]")
+_LATIN_RE = re.compile(r"[a-zA-Z]")
+# Abbreviated counters such as "12.5K" or "1,2M"
+_COUNT_ABBREVIATED_RE = re.compile(r"(\d+)(?:[.,](\d+))?\s*([KM])", re.I)
+_COUNT_SEPARATORS_RE = re.compile(r"[\s.,]")
+_COUNT_MULTIPLIERS = {"k": 1000, "m": 1000000}
+# Any of the social network domains, matched anywhere in a link
+_SOCIAL_RE = re.compile(r"vk\.com|t\.me|telegram|instagram|facebook|youtube")
+
+
+# Parsing runs in worker threads and an lxml parser serialises its users, so keep one per thread
+_parser_local = threading.local()
+
+
+def _html_parser() -> lxml.html.HTMLParser:
+    parser = getattr(_parser_local, "parser", None)
+    if parser is None:
+        # Comments and processing instructions never carry extracted text; don't build nodes
+        parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+        _parser_local.parser = parser
+    return parser
+
+
+def _html_tree(html: str) -> lxml.html.HtmlElement:
+    """Parse an HTML document, tolerating empty pages and XML declarations."""
+    html = html.lstrip()
+    if html.startswith("<?xml"):
+        # lxml rejects str input that declares its own encoding
+        html = html[html.find("?>") + 2:]
+    parser = _html_parser()
+    try:
+        return lxml.html.document_fromstring(html, parser=parser)
+    except etree.ParserError:
+        return lxml.html.document_fromstring("<html></html>", parser=parser)
+
+
+def _text(element: lxml.html.HtmlElement, separator: str = "", limit: Optional[int] = None) -> str:
+    """Stripped descendant text, joined like BeautifulSoup's get_text(strip=True).
+
+    With ``limit`` the walk stops once that many characters have been collected.
+    """
+    parts = []
+    size = 0
+    for text in element.itertext():
+        text = text.strip()
+        if text:
+            # Length of the joined result so far: separators only go between parts
+            size += len(text) + (len(separator) if parts else 0)
+            parts.append(text)
+            if limit is not None and size >= limit:
+                break
+    return separator.join(parts)
+
+
+def _fragment_text(fragment: str) -> str:
+    """Text of an HTML fragment, joined the same way as ``_text``."""
+    return "".join(html_lib.unescape(part).strip() for part in _TAG_RE.split(fragment))
+
+
+def _cache_key(url: str) -> str:
+    """Canonical form of a URL, so trivially different links share a cache entry."""
+    parts = urlsplit(url.strip())
+    # Tracking parameters don't change the page
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    query = urlencode([(k, v) for k, v in params if not k.startswith("utm_")])
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, "")
+    )
+
+
+def _block_text(html: str, match: re.Match) -> tuple[str, int]:
+    """Text of a div matched by a ``_tg_block_re`` pattern, and where the div ends.
+
+    The lazy pattern stops at the first ``</div>``; when the block nests divs,
+    its real end is found by counting div tags and the whole block is read
+    through lxml, as the DOM path would.
+    """
+    if _DIV_TAG_RE.search(match.group(1)) is None:
+        return _fragment_text(match.group(1)), match.end()
+
+    depth = 0
+    end = len(html)
+    for tag in _DIV_TAG_RE.finditer(html, match.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            close = html.find(">", tag.end())
+            end = close + 1 if close != -1 else len(html)
+            break
+    block = lxml.html.fragment_fromstring(html[match.start():end], parser=_html_parser())
+    return _text(block), end
+
+
+def _parse_count(text: str) -> Optional[int]:
+    """Parse a displayed counter like "1 234", "12.5K" or "1.2M" into an integer."""
+    match = _COUNT_ABBREVIATED_RE.fullmatch(text)
+    if match is not None:
+        whole, fraction, suffix = match.groups()
+        multiplier = _COUNT_MULTIPLIERS[suffix.lower()]
+        count = int(whole) * multiplier
+        if fraction:
+            count += int(fraction) * multiplier // 10 ** len(fraction)
+        return count
+
+    # Without a suffix, spaces, dots and commas only group thousands
+    digits = _COUNT_SEPARATORS_RE.sub("", text)
+    return int(digits) if digits.isdecimal() else None
+
+
+def _first(xpath: etree.XPath, tree: lxml.html.HtmlElement):
+    found = xpath(tree)
+    return found[0] if found else None
+
+
+def _page_nodes(tree: lxml.html.HtmlElement) -> tuple[dict, list[str], list[str]]:
+    """Bucket the nodes matched by ``_PAGE_NODES``.
+
+    Returns the first element of each kind, then the first 20 image sources and
+    all link targets in document order.
+    """
+    first = {}
+    images = []
+    links = []
+    for node in _PAGE_NODES(tree):
+        tag = node.tag
+        if tag == "img":
+            if len(images) < 20:
+                src = node.get("src")
+                if src is not None:
+                    images.append(src)
+        elif tag == "a":
+            href = node.get("href")
+            if href is not None:
+                links.append(href)
+        elif tag != "meta" or node.get("name") == "description":
+            first.setdefault(tag, node)
+        if node.get("role") == "main":
+            first.setdefault("role=main", node)
+        if "content" in (node.get("class") or "").split():
+            first.setdefault("class=content", node)
+        if node.get("id") == "content":
+            first.setdefault("id=content", node)
+    return first, images, links
+
+
 class ParserService:
     """Service for parsing websites and Telegram channels."""
 
     def __init__(self):
         self.timeout = 30.0
+        # Larger pages are cut off; everything extracted lives near the top
+        self.max_page_bytes = 1024 * 1024
+        # Recent results and in-flight parses, so repeat requests share one fetch
+        self.cache_ttl = 300.0
+        self.max_cached = 256
+        self._cache: dict[str, tuple[float, ParsedSite | ParsedTelegram]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                headers={"User-Agent": "AdFlow Bot/1.0"},
+                timeout=self.timeout,
+                follow_redirects=True,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100, max_keepalive_connections=20, keepalive_expiry=300.0
+                ),
+            )
+        return self.client
+
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
 
     async def parse(self, url: str) -> ParsedSite | ParsedTelegram:
-        """Parse URL - automatically detect if it's a website or Telegram channel."""
+        """Parse URL - automatically detect if it's a website or Telegram channel.
+
+        Results are reused for ``cache_ttl`` seconds and concurrent calls for the
+        same URL share a single fetch. URLs differing only in host case, a trailing
+        slash, the fragment or ``utm_*`` parameters count as the same URL.
+        """
+        key = _cache_key(url)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._parse_uncached(url))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish_parse(key, done))
+        # Shielded so one caller's cancellation doesn't abort the shared fetch
+        return await asyncio.shield(future)
+
+    def _finish_parse(self, key: str, future: asyncio.Future):
+        """Drop the in-flight entry and cache a successful result."""
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._cache.pop(key, None)
+        if len(self._cache) >= self.max_cached:
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = (time.monotonic() + self.cache_ttl, future.result())
+
+    async def _parse_uncached(self, url: str) -> ParsedSite | ParsedTelegram:
+        """Fetch and parse a URL, picking the parser by host."""
         parsed_url = urlparse(url)
 
         if "t.me" in parsed_url.netloc or "telegram" in parsed_url.netloc:
@@ -49,65 +307,78 @@ class ParserService:
         else:
             return await self.parse_website(url)
 
+    async def _fetch_html(self, url: str) -> str:
+        """GET a page, reading at most ``max_page_bytes`` of its body."""
+        async with self._get_client().stream("GET", url) as response:
+            response.raise_for_status()
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= self.max_page_bytes:
+                    break
+        # A cut may split a multi-byte character; replace it like response.text would
+        return body[:self.max_page_bytes].decode(response.encoding or "utf-8", errors="replace")
+
     async def parse_website(self, url: str) -> ParsedSite:
         """Parse a regular website."""
-        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
-            response = await client.get(url, headers={"User-Agent": "AdFlow Bot/1.0"})
-            response.raise_for_status()
-            html = response.text
+        html = await self._fetch_html(url)
+        # Parsing is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(self._parse_website_html, html, url)
 
-        soup = BeautifulSoup(html, "lxml")
+    def _parse_website_html(self, html: str, url: str) -> ParsedSite:
+        """Extract website data from fetched HTML."""
+        tree = _html_tree(html)
 
         # Remove scripts ; styles
-        for tag in soup(["script", "style", "noscript", "iframe"]):
-            tag.decompose()
+        etree.strip_elements(tree, "script", "style", "noscript", "iframe", with_tail=False)
 
         # Extract data
         result = ParsedSite(url=url)
+        first, image_sources, hrefs = _page_nodes(tree)
 
         # Title
-        if soup.title:
-            result.title = soup.title.string.strip() if soup.title.string else ""
+        title = first.get("title")
+        if title is not None:
+            result.title = (title.text or "").strip()
 
         # Meta description
-        meta_desc = soup.find("meta", attrs={"name": "description"})
-        if meta_desc:
-            result.meta_description = meta_desc.get("content", "")
+        meta_desc = first.get("meta")
+        if meta_desc is not None and meta_desc.get("content"):
+            result.meta_description = meta_desc.get("content")
 
         # H1
-        h1 = soup.find("h1")
-        if h1:
-            result.h1 = h1.get_text(strip=True)
+        h1 = first.get("h1")
+        if h1 is not None:
+            result.h1 = _text(h1)
 
         # Main text (try common content containers)
         main_text_parts = []
-        for selector in ["main", "article", '[role="main"]', ".content", "#content"]:
-            content = soup.select_one(selector)
-            if content:
-                main_text_parts.append(content.get_text(separator=" ", strip=True))
+        for kind in _MAIN_CONTENT:
+            content = first.get(kind)
+            if content is not None:
+                main_text_parts.append(_text(content, " ", limit=5000))
                 break
 
         if not main_text_parts:
             # Fallback: get body text
-            body = soup.find("body")
-            if body:
-                main_text_parts.append(body.get_text(separator=" ", strip=True)[:5000])
+            body = first.get("body")
+            if body is not None:
+                main_text_parts.append(_text(body, " ", limit=5000)[:5000])
 
         result.main_text = " ".join(main_text_parts)[:5000]  # Limit text
 
         # Images
         images = []
-        for img in soup.find_all("img", src=True)[:20]:
-            src = img["src"]
+        for src in image_sources:
             if src.startswith("http"):
                 images.append(src)
         result.images = images
 
         # Contact info
-        result.contact_info = self._extract_contact_info(result.main_text, soup)
+        result.contact_info = self._extract_contact_info(result.main_text, tree)
 
         # Social links
-        result.social_links = self._extract_social_links(soup)
+        result.social_links = self._extract_social_links(hrefs)
 
         # Language detection (simple)
         result.detected_language = self._detect_language(result.main_text)
@@ -125,104 +396,141 @@ class ParserService:
         else:
             preview_url = url
 
-        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
-            response = await client.get(preview_url, headers={"User-Agent": "AdFlow Bot/1.0"})
-            response.raise_for_status()
-            html = response.text
+        html = await self._fetch_html(preview_url)
+        return await asyncio.to_thread(self._parse_telegram_html, html, url)
+
+    def _parse_telegram_html(self, html: str, url: str) -> ParsedTelegram:
+        """Extract channel data from a fetched preview page."""
+        result = self._scrape_telegram(html, url)
+        if result is not None:
+            return result
 
-        soup = BeautifulSoup(html, "lxml")
+        # Unexpected markup: fall back to the DOM
+        return self._parse_telegram_tree(_html_tree(html), url)
 
+    def _parse_telegram_tree(self, tree: lxml.html.HtmlElement, url: str) -> ParsedTelegram:
+        """Extract channel data from a parsed preview page."""
         result = ParsedTelegram(url=url)
 
         # Channel name
-        name_el = soup.select_one(".tgme_channel_info_header_title")
-        if name_el:
-            result.channel_name = name_el.get_text(strip=True)
+        name_el = _first(_TG_NAME, tree)
+        if name_el is not None:
+            result.channel_name = _text(name_el)
 
         # Username
-        username_el = soup.select_one(".tgme_channel_info_header_username")
-        if username_el:
-            result.channel_username = username_el.get_text(strip=True).strip("@")
+        username_el = _first(_TG_USERNAME, tree)
+        if username_el is not None:
+            result.channel_username = _text(username_el).strip("@")
 
         # Description
-        desc_el = soup.select_one(".tgme_channel_info_description")
-        if desc_el:
-            result.description = desc_el.get_text(strip=True)
+        desc_el = _first(_TG_DESCRIPTION, tree)
+        if desc_el is not None:
+            result.description = _text(desc_el)
 
         # Subscribers
-        counter_el = soup.select_one(".tgme_channel_info_counter .counter_value")
-        if counter_el:
-            count_text = counter_el.get_text(strip=True).replace(" ", "").replace(",", "")
-            # Handle K, M suffixes
-            if count_text.endswith("K"):
-                result.subscribers = int(float(count_text[:-1]) * 1000)
-            elif count_text.endswith("M"):
-                result.subscribers = int(float(count_text[:-1]) * 1000000)
-            else:
-                try:
-                    result.subscribers = int(count_text)
-                except ValueError:
-                    pass
+        counter_el = _first(_TG_SUBSCRIBERS, tree)
+        if counter_el is not None:
+            result.subscribers = _parse_count(_text(counter_el))
 
         # Avatar
-        avatar_el = soup.select_one(".tgme_channel_info_header img")
-        if avatar_el and avatar_el.get("src"):
-            result.avatar_url = avatar_el["src"]
+        avatar_el = _first(_TG_AVATAR, tree)
+        if avatar_el is not None and avatar_el.get("src"):
+            result.avatar_url = avatar_el.get("src")
 
         # Recent posts
         posts = []
-        for msg in soup.select(".tgme_widget_message_text")[:5]:
-            text = msg.get_text(strip=True)
+        for msg in _TG_POSTS(tree)[:5]:
+            text = _text(msg)
+            if text:
+                posts.append(text[:500])
+        result.recent_posts = posts
+
+        return result
+
+    def _scrape_telegram(self, html: str, url: str) -> Optional[ParsedTelegram]:
+        """Regex-scrape a Telegram preview page; None if it isn't recognisable."""
+        name = _TG_NAME_RE.search(html)
+        if name is None:
+            return None
+
+        result = ParsedTelegram(url=url, channel_name=_block_text(html, name)[0])
+
+        username = _TG_USERNAME_RE.search(html)
+        if username is not None:
+            result.channel_username = _block_text(html, username)[0].strip("@")
+
+        description = _TG_DESCRIPTION_RE.search(html)
+        if description is not None:
+            result.description = _block_text(html, description)[0]
+
+        counter = _TG_SUBSCRIBERS_RE.search(html)
+        if counter is not None:
+            result.subscribers = _parse_count(_fragment_text(counter.group(1)))
+
+        avatar = _TG_AVATAR_RE.search(html)
+        if avatar is not None:
+            result.avatar_url = html_lib.unescape(avatar.group(1))
+
+        # First five post blocks, skipping empty ones, like the DOM path
+        posts = []
+        position = 0
+        for _ in range(5):
+            match = _TG_POST_RE.search(html, position)
+            if match is None:
+                break
+            text, position = _block_text(html, match)
             if text:
                 posts.append(text[:500])
         result.recent_posts = posts
 
         return result
 
-    def _extract_contact_info(self, text: str, soup: BeautifulSoup) -> dict:
+    def _extract_contact_info(self, text: str, tree: lxml.html.HtmlElement) -> dict:
         """Extract contact information from page."""
         contact = {}
 
         # Email
-        email_pattern = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
-        emails = re.findall(email_pattern, text)
-        if emails:
-            contact["email"] = emails[0]
+        email = _EMAIL_RE.search(text)
+        if email:
+            contact["email"] = email.group(0)
 
         # Phone (Russian format)
-        phone_pattern = r"[\+7|8][\s\-]?\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{2}[\s\-]?\d{2}"
-        phones = re.findall(phone_pattern, text)
-        if phones:
-            contact["phone"] = phones[0]
+        phone = _PHONE_RE.search(text)
+        if phone:
+            contact["phone"] = phone.group(0)
 
         # Address hints
-        addr_el = soup.find(string=re.compile(r"адрес|address", re.I))
-        if addr_el:
-            parent = addr_el.parent
-            if parent:
-                contact["address_hint"] = parent.get_text(strip=True)[:200]
+        node = _first(_ADDRESS_TEXT, tree)
+        if node is not None:
+            # Tail text belongs to the element enclosing its predecessor
+            parent = node.getparent()
+            if node.is_tail:
+                parent = parent.getparent()
+            if parent is not None:
+                contact["address_hint"] = _text(parent)[:200]
 
         return contact
 
-    def _extract_social_links(self, soup: BeautifulSoup) -> list[str]:
+    def _extract_social_links(self, hrefs: list[str]) -> list[str]:
         """Extract social media links."""
-        social_domains = ["vk.com", "t.me", "telegram", "instagram", "facebook", "youtube"]
-        social_links = []
-
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            for domain in social_domains:
-                if domain in href:
-                    social_links.append(href)
+        # Insertion-ordered set: first ten distinct links in page order
+        social_links = {}
+
+        for href in hrefs:
+            if href in social_links:
+                continue
+            if _SOCIAL_RE.search(href):
+                social_links[href] = None
+                if len(social_links) == 10:
                     break
 
-        return list(set(social_links))[:10]
+        return list(social_links)
 
     def _detect_language(self, text: str) -> str:
         """Simple language detection."""
         # Count Cyrillic vs Latin characters
-        cyrillic = len(re.findall(r"[а-яА-ЯёЁ]", text))
-        latin = len(re.findall(r"[a-zA-Z]", text))
+        cyrillic = len(_CYRILLIC_RE.findall(text))
+        latin = len(_LATIN_RE.findall(text))
 
         if cyrillic > latin:
             return "ru"
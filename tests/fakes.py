@@ -0,0 +1,34 @@
+import asyncio
+from typing import Optional
+
+from config import get_settings
+
+
+class FakeLLM:
+    """Stands in for llm_service; numbers each response so merged calls show up.
+
+    Structured calls validate ``structured`` against the requested schema, and
+    every call records the model it would have used.
+    """
+
+    settings = get_settings()
+
+    def __init__(self, structured: Optional[dict] = None):
+        self.calls = 0
+        self.models: list[str] = []
+        self.structured = structured or {}
+
+    def _record(self, model: Optional[str]) -> int:
+        self.calls += 1
+        self.models.append(model or self.settings.llm_model_main)
+        return self.calls
+
+    async def complete(self, model: Optional[str] = None, **kwargs) -> str:
+        call = self._record(model)
+        await asyncio.sleep(0.01)
+        return f"response {call}"
+
+    async def complete_structured(self, output_schema, model: Optional[str] = None, **kwargs):
+        self._record(model)
+        await asyncio.sleep(0.01)
+        return output_schema.model_validate(self.structured)
@@ -0,0 +1,50 @@
+import asyncio
+import uuid
+
+from agents.base import BaseAgent
+from tests.fakes import FakeLLM
+
+
+class EchoAgent(BaseAgent):
+    name = "echo"
+    role = "test"
+    system_prompt = "test"
+
+    async def execute(self, task):
+        raise NotImplementedError
+
+
+def make_agent() -> EchoAgent:
+    agent = EchoAgent(semaphore=asyncio.Semaphore(10))
+    agent.llm = FakeLLM()
+    return agent
+
+
+async def test_sampled_calls_are_not_merged():
+    agent = make_agent()
+    message = uuid.uuid4().hex
+    results = await asyncio.gather(*(agent.complete(message, temperature=0.7) for _ in range(3)))
+    assert agent.llm.calls == 3
+    assert len(set(results)) == 3
+
+
+async def test_deterministic_calls_share_one_request():
+    agent = make_agent()
+    message = uuid.uuid4().hex
+    results = await asyncio.gather(*(agent.complete(message, temperature=0) for _ in range(3)))
+    assert agent.llm.calls == 1
+    assert results == ["response 1"] * 3
+
+
+async def test_cancelled_leader_does_not_cancel_followers():
+    agent = make_agent()
+    message = uuid.uuid4().hex
+    leader = asyncio.create_task(agent.complete(message, temperature=0))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(agent.complete(message, temperature=0))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "response 1"
+    assert leader.cancelled()
+    assert agent.llm.calls == 1
@@ -0,0 +1,22 @@
+from agents.copywriter import _FIELD_LIMITS, fit_to_limits
+
+
+def test_button_text_limit_on_every_platform():
+    # Optional[ButtonText] must keep its constraint visible to fit_to_limits
+    for platform in ("vk", "telegram", "telegram_seeding"):
+        assert _FIELD_LIMITS[platform]["button_text"] == 25
+
+
+def _telegram_set(text: str) -> dict:
+    return {"creatives": [{"telegram": {"text": text, "button_text": "Go"}}]}
+
+
+def test_fit_to_limits_trims_small_overruns():
+    data = fit_to_limits(_telegram_set("слово " * 27))  # 162 chars, limit 160
+    assert len(data["creatives"][0]["telegram"]["text"]) <= 160
+
+
+def test_fit_to_limits_leaves_large_overruns_for_repair():
+    text = "слово " * 54  # about twice the limit
+    data = fit_to_limits(_telegram_set(text))
+    assert data["creatives"][0]["telegram"]["text"] == text
@@ -0,0 +1,37 @@
+import asyncio
+import uuid
+
+from agents.base import AgentTask, TaskType
+from agents.designer import DesignerAgent
+from agents.pm import ProjectManagerAgent
+from models.creative import Creative
+from models.strategy import AdPlatform
+from tests.fakes import FakeLLM
+
+
+async def test_repeated_analysis_hits_the_cache():
+    pm = ProjectManagerAgent(semaphore=asyncio.Semaphore(10))
+    pm.llm = FakeLLM(structured={"brief": {"business_name": "Cafe"}, "questions": []})
+    task = AgentTask(
+        task_type=TaskType.ANALYZE, description="analyze", input_data={"url": uuid.uuid4().hex}
+    )
+
+    first = await pm.execute(task)
+    second = await pm.execute(task)
+
+    assert first.success and second.success
+    assert second.output == first.output
+    assert pm.llm.calls == 1
+
+
+async def test_repeated_banner_specs_hit_the_cache():
+    designer = DesignerAgent(semaphore=asyncio.Semaphore(10))
+    designer.llm = FakeLLM(structured={"specs": []})
+    creatives = [
+        Creative(id=uuid.uuid4().hex, hypothesis_id="h1", platform=AdPlatform.VK_ADS)
+    ]
+
+    await designer._generate_specs_for(creatives, {}, {})
+    await designer._generate_specs_for(creatives, {}, {})
+
+    assert designer.llm.calls == 1
@@ -0,0 +1,99 @@
+import asyncio
+import uuid
+
+import routes  # noqa: F401  (loads before core.orchestrator, as in main)
+from agents.base import AgentResponse, AgentTask, BaseAgent, ReviewResult, TaskType
+from config import get_settings
+from core.orchestrator import Orchestrator
+from models.artifact import ArtifactType
+from tests.fakes import FakeLLM
+
+
+class DraftAgent(BaseAgent):
+    name = "drafter"
+    role = "test"
+    system_prompt = "test"
+
+    def __init__(self):
+        super().__init__(semaphore=asyncio.Semaphore(10))
+        self.llm = FakeLLM()
+        self.message = uuid.uuid4().hex
+
+    async def execute(self, task):
+        # Deterministic settings, the worst case for request merging
+        text = await self.complete(self.message, temperature=0)
+        return AgentResponse(success=True, output=text)
+
+
+class RejectingPM:
+    def __init__(self):
+        self.reviews = 0
+
+    async def execute(self, task):
+        self.reviews += 1
+        await asyncio.sleep(0.01)
+        return AgentResponse(success=True, output=ReviewResult(approved=False, score=5))
+
+
+async def test_parallel_drafts_are_distinct_requests():
+    orchestrator = Orchestrator()
+    orchestrator.parallel_drafts = 3
+    orchestrator.pm = RejectingPM()
+    agent = DraftAgent()
+    task = AgentTask(task_type=TaskType.CREATE, description="draft")
+
+    async def speculate(output):
+        await asyncio.sleep(1)
+
+    response, _, _, speculative = await orchestrator._parallel_drafts(
+        agent, task, ArtifactType.STRATEGY, [], None, lambda field: None, speculate
+    )
+    await asyncio.sleep(0)
+
+    assert agent.llm.calls == 3
+    assert orchestrator.pm.reviews == 3
+    assert response.success
+    assert speculative is not None and not speculative.done()
+    speculative.cancel()
+
+
+def _reviewing_pm(orchestrator: Orchestrator) -> FakeLLM:
+    llm = FakeLLM(structured={"approved": True, "score": 9})
+    orchestrator.pm.llm = llm
+    orchestrator.pm.semaphore = asyncio.Semaphore(10)
+    return llm
+
+
+async def test_reviews_use_the_main_model_by_default():
+    orchestrator = Orchestrator()
+    llm = _reviewing_pm(orchestrator)
+    review = await orchestrator.pm.execute(
+        orchestrator._review_task(ArtifactType.COPY, {"id": uuid.uuid4().hex}, [])
+    )
+    assert review.success
+    assert llm.models == [get_settings().llm_model_main]
+
+
+async def test_fast_reviews_are_opt_in(monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_fast_reviews", True)
+    orchestrator = Orchestrator()
+    llm = _reviewing_pm(orchestrator)
+    await orchestrator.pm.execute(
+        orchestrator._review_task(ArtifactType.COPY, {"id": uuid.uuid4().hex}, [])
+    )
+    assert llm.models == [get_settings().llm_model_fast]
+
+
+async def test_worker_logs_failed_jobs(caplog):
+    orchestrator = Orchestrator()
+
+    async def broken_job():
+        raise RuntimeError("boom")
+
+    orchestrator.start_workers(1)
+    orchestrator.enqueue(broken_job)
+    await orchestrator._pipeline_queue.join()
+    await orchestrator.stop_workers()
+
+    assert "broken_job" in caplog.text
+    assert "boom" in caplog.text
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import lxml.html
+
+from services.parser import _PHONE_RE, _html_tree, _text, parser_service
+
+
+def test_phone_requires_russian_prefix():
+    assert _PHONE_RE.search("Звоните: +7 (999) 123-45-67").group(0) == "+7 (999) 123-45-67"
+    assert _PHONE_RE.search("8 999 123 45 67").group(0) == "8 999 123 45 67"
+    assert _PHONE_RE.search("|999 123 45 67") is None
+
+
+def test_text_limit_counts_only_inner_separators():
+    element = lxml.html.fromstring("<div><p>aaaa</p><p>bbbb</p><p>cccc</p></div>")
+    full = _text(element, " ")
+    for limit in range(1, len(full) + 1):
+        assert _text(element, " ", limit=limit)[:limit] == full[:limit]
+
+
+def test_telegram_regex_scrape_matches_dom_path():
+    html = (Path(__file__).parent / "fixtures" / "telegram_preview.html").read_text()
+    url = "https://t.me/cafe"
+
+    scraped = parser_service._scrape_telegram(html, url)
+    parsed = parser_service._parse_telegram_tree(_html_tree(html), url)
+
+    assert scraped == parsed
+    assert scraped.recent_posts[1] == "Post twonestedtail"
+    assert scraped.subscribers == 12500
@@ -0,0 +1,47 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from models.creative import CreativeSet
+from models.project import Project, ProjectStatus
+from routes.projects import orchestrator, projects_db
+
+client = TestClient(app)
+
+
+def _completed_project() -> Project:
+    project = Project(
+        id=uuid.uuid4().hex, user_id="user_1", name="Test", url="https://example.com",
+        status=ProjectStatus.COMPLETED,
+    )
+    projects_db[project.id] = project
+    return project
+
+
+@pytest.mark.filterwarnings("error")
+def test_health_has_no_deprecation_warnings():
+    response = client.get("/health")
+    assert response.json() == {"status": "healthy"}
+
+
+@pytest.mark.filterwarnings("error")
+def test_regenerate_returns_typed_creatives(monkeypatch):
+    project = _completed_project()
+
+    async def regenerate(project, creative_id, feedback):
+        return CreativeSet(total_by_platform={"vk_ads": 1})
+
+    monkeypatch.setattr(orchestrator, "regenerate_creative", regenerate)
+    response = client.post(
+        f"/api/projects/{project.id}/creatives/regenerate", json={"creative_id": "c1"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {
+        "message": "Creative regenerated",
+        "creative_id": "c1",
+        "creatives": {"creatives": [], "total_by_platform": {"vk_ads": 1}},
+    }
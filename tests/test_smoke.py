@@ -0,0 +1,5 @@
+def test_app_imports():
+    """The ASGI entry point used by uvicorn must import cleanly."""
+    import main
+
+    assert main.app is not None